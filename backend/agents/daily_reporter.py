@@ -178,37 +178,37 @@ class DailyReporter:
         """Calculate session-based report statistics."""
         total_sessions = len(violations)  # 1 row = 1 session (not 1 detection!)
 
-        no_helmet = sum(1 for v in violations if v.violation_type == "no_helmet")
-        no_vest = sum(1 for v in violations if v.violation_type == "no_vest")
-        both_missing = sum(1 for v in violations if v.violation_type == "both_missing")
+        # Single pass over the rows — the per-type counts, compliance,
+        # SAM and session metrics used to be seven separate generator
+        # sweeps with a string compare each; all the counters are
+        # independent, so they fuse into one loop.
+        type_counts = {"no_helmet": 0, "no_vest": 0, "both_missing": 0}
+        compliant = 0
+        sam_activations = 0
+        total_occurrences = 0       # re-detections across all sessions
+        total_duration_minutes = 0.0
+        longest_session_minutes = 0.0
 
-        # Count compliant sessions
-        compliant = sum(1 for v in violations if v.has_helmet and v.has_vest)
-        total_violations = total_sessions - compliant
+        for v in violations:
+            vtype = v.violation_type
+            if vtype in type_counts:
+                type_counts[vtype] += 1
+            compliant += v.has_helmet and v.has_vest
+            sam_activations += bool(v.sam_activated)
+            total_occurrences += v.occurrence_count or 1
+            duration = v.total_duration_minutes or 0.0
+            total_duration_minutes += duration
+            if duration > longest_session_minutes:
+                longest_session_minutes = duration
 
+        total_violations = total_sessions - compliant
         compliance_rate = (compliant / total_sessions * 100) if total_sessions > 0 else 100.0
 
-        # SAM activation stats
-        sam_activations = sum(1 for v in violations if v.sam_activated)
-
-        # === Session-based metrics (thesis contribution) ===
-        # Total re-detections across all sessions
-        total_occurrences = sum(
-            (v.occurrence_count or 1) for v in violations
-        )
-        # Total violation time across all sessions
-        total_duration_minutes = sum(
-            (v.total_duration_minutes or 0.0) for v in violations
-        )
         # Average session duration
         avg_duration_minutes = (
             total_duration_minutes / total_violations
             if total_violations > 0 else 0.0
         )
-        # Longest single violation session
-        longest_session_minutes = max(
-            (v.total_duration_minutes or 0.0) for v in violations
-        ) if violations else 0.0
 
         return {
             # Basic counts
@@ -216,9 +216,9 @@ class DailyReporter:
             "total_detections": total_sessions,       # kept for compatibility
             "total_violations": total_violations,
             "compliance_rate": compliance_rate,
-            "no_helmet_count": no_helmet,
-            "no_vest_count": no_vest,
-            "both_missing_count": both_missing,
+            "no_helmet_count": type_counts["no_helmet"],
+            "no_vest_count": type_counts["no_vest"],
+            "both_missing_count": type_counts["both_missing"],
             "sam_activations": sam_activations,
             # Session-based metrics
             "total_occurrences": total_occurrences,
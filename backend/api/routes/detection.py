@@ -249,7 +249,7 @@ async def detect_violations(
                 annotated_path=annotated_path
             )
             # Attach callback to already-submitted job
-            job = async_sam._jobs.get(job_id)
+            job = async_sam.get_job(job_id)
             if job:
                 job.on_complete = callback
 
@@ -376,7 +376,8 @@ async def websocket_webcam(websocket: WebSocket, camera_index: int = 0):
             
             # Run detection
             result = detector.detect(frame, save_annotated=False)
-            annotated = draw_detections(frame, result)
+            # Frame is not reused after this iteration — draw in place
+            annotated = draw_detections(frame, result, inplace=True)
             
             # Send result
             await websocket.send_json({
@@ -397,5 +398,79 @@ async def websocket_webcam(websocket: WebSocket, camera_index: int = 0):
             pass
 
 
+@router.websocket("/ws/webcam/binary")
+async def websocket_webcam_binary(websocket: WebSocket, camera_index: int = 0):
+    """
+    Binary WebSocket endpoint for real-time webcam detection.
+
+    Each processed frame arrives as TWO messages: the raw JPEG bytes as
+    a binary frame, then the metadata as a small JSON message. Compared
+    to /ws/webcam this skips base64 entirely — ~25% less egress per
+    frame and none of the bytes→str→JSON copy chain on the hot path.
+    Client can send 'stop' to end the stream.
+    """
+    await websocket.accept()
+
+    cap = cv2.VideoCapture(camera_index)
+    if not cap.isOpened():
+        await websocket.send_json({"error": "Could not open webcam"})
+        await websocket.close()
+        return
+
+    detector = get_hybrid_detector()
+    frame_count = 0
+    frame_skip = 3  # Process every 3rd frame for real-time performance
+    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
+
+    try:
+        while True:
+            # Check for client messages
+            try:
+                data = await asyncio.wait_for(
+                    websocket.receive_text(),
+                    timeout=0.01
+                )
+                if data == "stop":
+                    break
+            except asyncio.TimeoutError:
+                pass
+            except WebSocketDisconnect:
+                break
+
+            ret, frame = cap.read()
+            if not ret:
+                continue
+
+            frame_count += 1
+            if frame_count % frame_skip != 0:
+                continue
+
+            # Run detection
+            result = detector.detect(frame, save_annotated=False)
+            # Frame is not reused after this iteration — draw in place
+            annotated = draw_detections(frame, result, inplace=True)
+
+            ok, jpeg = cv2.imencode('.jpg', annotated, encode_param)
+            if not ok:
+                continue
+
+            await websocket.send_bytes(jpeg.tobytes())
+            await websocket.send_json({
+                "frame_number": frame_count,
+                "persons": result["persons"],
+                "stats": result["stats"],
+                "timing": result["timing"]
+            })
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        cap.release()
+        try:
+            await websocket.close()
+        except:
+            pass
+
+
 # Import asyncio for WebSocket
 import asyncio
@@ -72,12 +72,19 @@ class Violation(Base):
     total_duration_minutes = Column(Float, default=0.0)      # Total violation duration in minutes
     is_active_session = Column(Boolean, default=True)        # Is worker still in frame?
     
-    # Indexes for efficient queries
+    # Indexes for efficient queries. The composite (timestamp,
+    # violation_type, camera_id) index covers the stats/trend GROUP BY
+    # queries entirely, so they resolve as index-only scans instead of
+    # table scans once the table grows; (report_sent, report_date)
+    # does the same for the unreported-violations report query.
     __table_args__ = (
         Index('idx_violations_timestamp', 'timestamp'),
         Index('idx_violations_report_date', 'report_date'),
         Index('idx_violations_violation_type', 'violation_type'),
         Index('idx_violations_report_sent', 'report_sent'),
+        Index('idx_violations_ts_type_camera',
+              'timestamp', 'violation_type', 'camera_id'),
+        Index('idx_violations_report_sent_date', 'report_sent', 'report_date'),
     )
     
     def __repr__(self) -> str:
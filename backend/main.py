@@ -70,20 +70,27 @@ async def lifespan(app: FastAPI):
     # Pre-load models (optional - can be lazy loaded)
     if not settings.debug:
         print("🤖 Pre-loading ML models...")
-        try:
-            from services.yolo_detector import get_yolo_detector
-            from services.sam_verifier import get_sam_verifier
-            
-            yolo = get_yolo_detector()
-            yolo.load_model()
-            
-            sam = get_sam_verifier()
-            sam.load_model()
-            
-            print("✅ Models loaded successfully")
-        except Exception as e:
-            print(f"⚠️ Model pre-loading failed: {e}")
-            print("   Models will be loaded on first request")
+
+        def _preload_models():
+            try:
+                from services.yolo_detector import get_yolo_detector
+                from services.sam_verifier import get_sam_verifier
+
+                get_yolo_detector().load_model()
+                get_sam_verifier().load_model()
+
+                print("✅ Models loaded successfully")
+            except Exception as e:
+                print(f"⚠️ Model pre-loading failed: {e}")
+                print("   Models will be loaded on first request")
+
+        # Load in a worker thread so startup (and early health checks)
+        # aren't blocked behind the multi-second SAM weight load. Both
+        # singleton getters and both load_model methods use
+        # double-checked locking, so a request arriving mid-load waits
+        # on the model lock instead of double-loading.
+        import asyncio
+        asyncio.get_running_loop().run_in_executor(None, _preload_models)
     
     # Start daily reporter (if email is configured)
     if settings.sender_email and settings.sender_password:
@@ -111,7 +118,15 @@ async def lifespan(app: FastAPI):
         reporter.stop()
     except:
         pass
-    
+
+    # Release any cached webcam handles
+    try:
+        import services.stream_processor as stream_processor
+        if stream_processor._stream_processor is not None:
+            stream_processor._stream_processor.release_webcams()
+    except:
+        pass
+
     print("✅ Shutdown complete")
 
 
@@ -186,16 +201,35 @@ app.include_router(reports_router)
 
 
 # === Static Files ===
+# NOTE: for production traffic put Nginx/Caddy in front of these mounts —
+# StaticFiles reads from disk inside the ASGI worker and competes with
+# inference requests under load.
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles with a long-lived immutable Cache-Control header.
+
+    Upload filenames embed a timestamp + uuid, so a given URL never changes
+    content. Browsers can cache forever, and conditional GETs (If-None-Match)
+    get a 304 from Starlette without re-reading the file.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 
-# Serve uploaded images
+# Serve uploaded images (content-addressed → immutable caching)
 uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(uploads_dir, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+app.mount("/uploads", ImmutableStaticFiles(directory=uploads_dir, check_dir=False), name="uploads")
 
-# Serve reports
+# Serve reports (regenerated in place per date — no immutable caching)
 reports_dir = os.path.join(os.path.dirname(__file__), "reports")
 os.makedirs(reports_dir, exist_ok=True)
-app.mount("/reports", StaticFiles(directory=reports_dir), name="reports")
+app.mount("/reports", StaticFiles(directory=reports_dir, check_dir=False), name="reports")
 
 
 # === Health Check ===
@@ -15,6 +15,8 @@ import time
 import json
 import argparse
 from pathlib import Path
+from collections import Counter
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -28,19 +30,105 @@ from services.hybrid_detector import get_hybrid_detector
 from services.yolo_detector import get_yolo_detector
 
 
+@dataclass(slots=True)
+class TimingRow:
+    """Per-image timing sample (slots: no per-instance __dict__ in the hot loop)."""
+    image: str
+    total_ms: float
+    yolo_ms: float
+    sam_ms: float
+
+
+@dataclass(slots=True)
+class ImageResult:
+    """Per-image detection summary."""
+    image: str
+    persons: int
+    violations: int
+    sam_activations: int
+    processing_ms: float
+
+
+def _evaluation_worker(rank: int, world: int, image_paths: List[str], result_queue):
+    """
+    Per-process evaluation worker (torch.multiprocessing.spawn target).
+
+    Each worker holds its own model replica, binds to its own GPU
+    (cuda:{rank}) when available, and processes images[rank::world].
+    Aggregated counters and timing rows are sent back via result_queue.
+    """
+    import torch
+    from services.yolo_detector import YOLODetector
+    from services.hybrid_detector import HybridDetector
+
+    device = f"cuda:{rank}" if torch.cuda.is_available() else "cpu"
+    detector = HybridDetector(yolo_detector=YOLODetector(device=device))
+
+    shard = image_paths[rank::world]
+    totals = {"persons": 0, "violations": 0, "sam_activations": 0}
+    path_counts: Dict[str, int] = {}
+    timing_rows = []
+    result_rows = []
+
+    for img_path in shard:
+        image = cv2.imread(img_path)
+        if image is None:
+            continue
+
+        frame_start = time.perf_counter_ns()
+        result = detector.detect(image, save_annotated=False)
+        frame_time = (time.perf_counter_ns() - frame_start) / 1_000_000
+
+        stats = result["stats"]
+        totals["persons"] += stats["total_persons"]
+        totals["violations"] += stats["total_violations"]
+        totals["sam_activations"] += stats["sam_activations"]
+
+        for path, count in stats["path_distribution"].items():
+            path_counts[path] = path_counts.get(path, 0) + count
+
+        name = Path(img_path).name
+        timing_rows.append((
+            name, frame_time,
+            result["timing"]["yolo_ms"], result["timing"]["sam_ms"]
+        ))
+        result_rows.append((
+            name, stats["total_persons"], stats["total_violations"],
+            stats["sam_activations"], frame_time
+        ))
+
+    result_queue.put({
+        "rank": rank,
+        "totals": totals,
+        "path_counts": path_counts,
+        "timing_rows": timing_rows,
+        "result_rows": result_rows,
+    })
+
+
 class EvaluationRunner:
     """Run evaluation on test dataset and generate metrics."""
-    
-    def __init__(self, test_dir: str, output_dir: str):
+
+    def __init__(self, test_dir: str, output_dir: str, num_workers: int = 1):
         self.test_dir = Path(test_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
+        self.num_workers = max(1, num_workers)
+
         self.detector = get_hybrid_detector()
-        
-        # Results storage
-        self.results = []
-        self.timing_data = []
+
+        # Optional: libjpeg-turbo SIMD decoder — typically 2-4x faster than
+        # cv2.imread for JPEGs. Falls back to cv2.imread when unavailable.
+        try:
+            from turbojpeg import TurboJPEG, TJPF_BGR
+            self._jpeg = TurboJPEG()
+            self._jpeg_pixel_format = TJPF_BGR
+        except Exception:
+            self._jpeg = None
+
+        # Results storage (slots dataclasses — cheaper than per-image dicts)
+        self.results: List[ImageResult] = []
+        self.timing_data: List[TimingRow] = []
         
     def find_images(self) -> List[Path]:
         """Find all test images."""
@@ -52,7 +140,107 @@ class EvaluationRunner:
             images.extend(self.test_dir.glob(f'*{ext.upper()}'))
         
         return sorted(images)
-    
+
+    def enable_cuda_graph(self):
+        """
+        Capture the YOLO backbone into a CUDA Graph and replay it per frame.
+
+        The whole run uses one fixed imgsz, so every forward launches the same
+        kernel sequence with identical shapes. Replaying a captured graph
+        removes per-kernel launch overhead (~10-25% on small batches).
+        Falls back silently to the normal forward for any non-captured shape.
+        """
+        try:
+            import torch
+        except ImportError:
+            return False
+
+        if not torch.cuda.is_available():
+            print("⚠️ --cuda-graph requested but CUDA unavailable — ignoring")
+            return False
+
+        try:
+            from config.settings import settings
+
+            yolo = self.detector.yolo_detector
+            yolo.load_model()
+            module = yolo.model.model  # Underlying nn.Module inside ultralytics
+            module.eval().cuda()
+
+            imgsz = settings.yolo_imgsz
+            static_in = torch.zeros((1, 3, imgsz, imgsz), device="cuda")
+
+            # Warm up (cuDNN autotune etc. must settle before capture)
+            with torch.inference_mode():
+                for _ in range(3):
+                    module(static_in)
+            torch.cuda.synchronize()
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                static_out = module(static_in)
+
+            original_forward = module.forward
+
+            # AutoBackend.forward always calls the model with these
+            # kwargs present, just at their falsy defaults — a bare
+            # `not kwargs` gate would therefore never replay on the
+            # real predict path and fall back on every frame
+            benign_kwargs = {"augment", "visualize", "embed"}
+            replays = [0]
+
+            def graphed_forward(x, *args, **kwargs):
+                if (
+                    not args
+                    and x.shape == static_in.shape
+                    and x.dtype == static_in.dtype
+                    and all(not kwargs.get(k) for k in benign_kwargs)
+                    and not (kwargs.keys() - benign_kwargs)
+                ):
+                    static_in.copy_(x)
+                    graph.replay()
+                    replays[0] += 1
+                    return static_out
+                return original_forward(x, *args, **kwargs)
+
+            module.forward = graphed_forward
+
+            # Prove replay engages before claiming success: probe the
+            # patched module exactly the way AutoBackend invokes it
+            with torch.inference_mode():
+                module(static_in, augment=False, visualize=False, embed=None)
+            if replays[0] == 0:
+                module.forward = original_forward
+                print("⚠️ CUDA Graph captured but replay did not engage "
+                      "on the predict path — using eager forward")
+                return False
+
+            print(f"✅ CUDA Graph active for (1, 3, {imgsz}, {imgsz}) "
+                  f"inference — replay verified on probe call")
+            return True
+
+        except Exception as e:
+            print(f"⚠️ CUDA Graph capture failed ({e}) — using eager forward")
+            return False
+
+    def _load_image(self, img_path: Path):
+        """
+        Decode a test image.
+
+        JPEGs go through TurboJPEG when available (SIMD decode, releases the
+        GIL); everything else (PNG/WebP) uses cv2.imread.
+        """
+        if self._jpeg is not None and img_path.suffix.lower() in ('.jpg', '.jpeg'):
+            try:
+                return self._jpeg.decode(
+                    img_path.read_bytes(),
+                    pixel_format=self._jpeg_pixel_format
+                )
+            except Exception:
+                pass  # Corrupt/progressive JPEG — let OpenCV try
+
+        return cv2.imread(str(img_path))
+
     def run_evaluation(self) -> Dict[str, Any]:
         """Run evaluation on all test images."""
         images = self.find_images()
@@ -66,41 +254,48 @@ class EvaluationRunner:
         print(f"Test Directory: {self.test_dir}")
         print(f"Total Images: {len(images)}")
         print(f"{'='*60}\n")
-        
+
+        # Parallel path: shard images across worker processes
+        if self.num_workers > 1:
+            return self._run_parallel(images)
+
         # Process each image
         total_persons = 0
         total_violations = 0
         sam_activations = 0
-        path_counts = {
+        # Counter.update runs in C — cheaper than a Python for-loop with a
+        # per-key membership check. The detector only emits these five paths.
+        path_counts = Counter({
             "Fast Safe": 0,
             "Fast Violation": 0,
             "Rescue Head": 0,
             "Rescue Body": 0,
             "Critical": 0
-        }
-        
+        })
+
         start_time = time.time()
         
         for i, img_path in enumerate(images, 1):
             try:
                 # Load image
-                image = cv2.imread(str(img_path))
+                image = self._load_image(img_path)
                 if image is None:
                     print(f"[{i}/{len(images)}] ⚠️ Failed to load: {img_path.name}")
                     continue
                 
-                # Run detection
-                frame_start = time.time()
+                # Run detection (monotonic ns clock — time.time() is only
+                # ms-resolution on some platforms and can step backwards)
+                frame_start = time.perf_counter_ns()
                 result = self.detector.detect(image, save_annotated=False)
-                frame_time = (time.time() - frame_start) * 1000
+                frame_time = (time.perf_counter_ns() - frame_start) / 1_000_000
                 
                 # Store timing
-                self.timing_data.append({
-                    "image": img_path.name,
-                    "total_ms": frame_time,
-                    "yolo_ms": result["timing"]["yolo_ms"],
-                    "sam_ms": result["timing"]["sam_ms"]
-                })
+                self.timing_data.append(TimingRow(
+                    image=img_path.name,
+                    total_ms=frame_time,
+                    yolo_ms=result["timing"]["yolo_ms"],
+                    sam_ms=result["timing"]["sam_ms"]
+                ))
                 
                 # Aggregate stats
                 stats = result["stats"]
@@ -109,18 +304,16 @@ class EvaluationRunner:
                 sam_activations += stats["sam_activations"]
                 
                 # Path distribution
-                for path, count in stats["path_distribution"].items():
-                    if path in path_counts:
-                        path_counts[path] += count
+                path_counts.update(stats["path_distribution"])
                 
                 # Store result
-                self.results.append({
-                    "image": img_path.name,
-                    "persons": stats["total_persons"],
-                    "violations": stats["total_violations"],
-                    "sam_activations": stats["sam_activations"],
-                    "processing_ms": frame_time
-                })
+                self.results.append(ImageResult(
+                    image=img_path.name,
+                    persons=stats["total_persons"],
+                    violations=stats["total_violations"],
+                    sam_activations=stats["sam_activations"],
+                    processing_ms=frame_time
+                ))
                 
                 # Progress
                 status = "✅" if stats["total_violations"] == 0 else "⚠️"
@@ -149,9 +342,89 @@ class EvaluationRunner:
         
         # Save results
         self._save_results(metrics)
-        
+
         return metrics
-    
+
+    def _run_parallel(self, images: List[Path]) -> Dict[str, Any]:
+        """
+        Run evaluation with multiple worker processes.
+
+        Spawns num_workers processes via torch.multiprocessing, each with its
+        own model replica. On multi-GPU hosts worker i binds cuda:{i}; on a
+        single GPU the workers time-slice it. Per-worker aggregates are merged
+        here before calculating metrics.
+        """
+        import torch.multiprocessing as mp
+
+        print(f"Running with {self.num_workers} worker processes...")
+
+        image_paths = [str(p) for p in images]
+        ctx = mp.get_context("spawn")
+        result_queue = ctx.SimpleQueue()
+
+        start_time = time.time()
+
+        # join=False: the queue must be drained BEFORE joining. Each
+        # worker's single put pickles its per-image rows into a pipe
+        # with a finite OS buffer (~64KB); on large runs the worker
+        # blocks in put until the parent reads, so joining first would
+        # deadlock — parent stuck in join, workers stuck in put.
+        spawn_ctx = mp.spawn(
+            _evaluation_worker,
+            args=(self.num_workers, image_paths, result_queue),
+            nprocs=self.num_workers,
+            join=False
+        )
+
+        # Merge per-worker aggregates
+        total_persons = 0
+        total_violations = 0
+        sam_activations = 0
+        path_counts = {
+            "Fast Safe": 0,
+            "Fast Violation": 0,
+            "Rescue Head": 0,
+            "Rescue Body": 0,
+            "Critical": 0
+        }
+
+        for _ in range(self.num_workers):
+            worker_result = result_queue.get()
+            totals = worker_result["totals"]
+            total_persons += totals["persons"]
+            total_violations += totals["violations"]
+            sam_activations += totals["sam_activations"]
+
+            for path, count in worker_result["path_counts"].items():
+                if path in path_counts:
+                    path_counts[path] += count
+
+            for row in worker_result["timing_rows"]:
+                self.timing_data.append(TimingRow(*row))
+            for row in worker_result["result_rows"]:
+                self.results.append(ImageResult(*row))
+
+        # All nprocs results are in hand, so every worker is past its
+        # put and join can no longer block on a full pipe
+        while not spawn_ctx.join():
+            pass
+
+        total_time = time.time() - start_time
+
+        metrics = self._calculate_metrics(
+            total_persons=total_persons,
+            total_violations=total_violations,
+            sam_activations=sam_activations,
+            path_counts=path_counts,
+            num_images=len(images),
+            total_time=total_time
+        )
+
+        self._print_summary(metrics)
+        self._save_results(metrics)
+
+        return metrics
+
     def _calculate_metrics(
         self,
         total_persons: int,
@@ -164,9 +437,9 @@ class EvaluationRunner:
         """Calculate evaluation metrics."""
         
         # Timing stats
-        avg_time = np.mean([t["total_ms"] for t in self.timing_data]) if self.timing_data else 0
-        avg_yolo = np.mean([t["yolo_ms"] for t in self.timing_data]) if self.timing_data else 0
-        avg_sam = np.mean([t["sam_ms"] for t in self.timing_data]) if self.timing_data else 0
+        avg_time = np.mean([t.total_ms for t in self.timing_data]) if self.timing_data else 0
+        avg_yolo = np.mean([t.yolo_ms for t in self.timing_data]) if self.timing_data else 0
+        avg_sam = np.mean([t.sam_ms for t in self.timing_data]) if self.timing_data else 0
         
         # FPS
         fps = num_images / total_time if total_time > 0 else 0
@@ -255,16 +528,16 @@ class EvaluationRunner:
             json.dump(metrics, f, indent=2)
         print(f"📁 Metrics saved: {metrics_file}")
         
-        # Per-image results
+        # Per-image results (convert slots dataclasses to dicts only at dump time)
         results_file = self.output_dir / f"evaluation_results_{timestamp}.json"
         with open(results_file, "w") as f:
-            json.dump(self.results, f, indent=2)
+            json.dump([asdict(r) for r in self.results], f, indent=2)
         print(f"📁 Results saved: {results_file}")
-        
+
         # Timing data
         timing_file = self.output_dir / f"evaluation_timing_{timestamp}.json"
         with open(timing_file, "w") as f:
-            json.dump(self.timing_data, f, indent=2)
+            json.dump([asdict(t) for t in self.timing_data], f, indent=2)
         print(f"📁 Timing saved: {timing_file}")
 
 
@@ -280,13 +553,28 @@ def main():
         default="./evaluation_results",
         help="Output directory for results"
     )
-    
+    parser.add_argument(
+        "--num-workers", "-w",
+        type=int,
+        default=1,
+        help="Number of parallel worker processes (one model replica each)"
+    )
+    parser.add_argument(
+        "--cuda-graph",
+        action="store_true",
+        help="Capture the fixed-shape YOLO forward into a CUDA Graph for replay"
+    )
+
     args = parser.parse_args()
-    
+
     runner = EvaluationRunner(
         test_dir=args.test_dir,
-        output_dir=args.output
+        output_dir=args.output,
+        num_workers=args.num_workers
     )
+
+    if args.cuda_graph:
+        runner.enable_cuda_graph()
     
     try:
         metrics = runner.run_evaluation()
@@ -0,0 +1,71 @@
+"""
+SAM Export Script
+
+Exports the SAM weights to ONNX or a TensorRT engine with FP16. The
+SAM encoder is a dense ViT — compute-bound matmul work that gains from
+FP16 tensor cores and runtime kernel fusion, so a fused engine roughly
+halves encoder latency on Ampere+ GPUs.
+
+Uses the ultralytics export path rather than a hand-rolled
+torch.onnx.export: SAM 3 bundles the image encoder, text encoder and
+mask decoder, and ultralytics knows how to trace the full predictor
+graph. Point settings.sam_model_path at the exported file afterwards.
+
+Run from backend/ directory:
+    python scripts/export_sam_onnx.py                      # ONNX, FP16
+    python scripts/export_sam_onnx.py --format engine      # TensorRT
+"""
+
+import argparse
+import os
+import sys
+
+# -- Add backend root to path -------------------------------------------------
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from config.settings import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export SAM to ONNX/TensorRT")
+    parser.add_argument(
+        "--weights",
+        default=settings.sam_model_path,
+        help="Path to SAM .pt weights (default: settings.sam_model_path)"
+    )
+    parser.add_argument(
+        "--format",
+        default="onnx",
+        choices=["onnx", "engine"],
+        help="Export format: onnx (ONNX Runtime) or engine (TensorRT)"
+    )
+    parser.add_argument(
+        "--device",
+        default=0,
+        help="Export device (TensorRT engines must be built on the GPU "
+             "they will run on)"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.weights):
+        print(f"❌ SAM weights not found at {args.weights}")
+        sys.exit(1)
+
+    from ultralytics import SAM
+
+    model = SAM(args.weights)
+    exported = model.export(
+        format=args.format,
+        half=True,                  # FP16 — tensor cores + half bandwidth
+        imgsz=settings.sam_imgsz,
+        device=args.device,
+    )
+
+    print(f"✅ Exported to {exported}")
+    print("   Set SAM_MODEL_PATH (settings.sam_model_path) to this file "
+          "to serve the fused model.")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,12 @@ Academic Framing:
     asynchronous SAM for semantic verification within the cooldown window."
 """
 
+import asyncio
+import os
 import time
+import queue
 import threading
+import itertools
 import logging
 from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass, field
@@ -31,24 +35,99 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Optional Prometheus metrics — C-level atomic adds, and latency becomes a
+# histogram (p50/p95/p99) rather than a mean, which is what a real-time
+# claim actually needs. get_stats() keeps working either way.
+try:
+    from prometheus_client import Counter as _PromCounter, Histogram as _PromHistogram
+
+    _PROM_JOBS = _PromCounter(
+        "sam_jobs_total",
+        "Async SAM verification jobs by outcome",
+        ["status"]
+    )
+    _PROM_LATENCY = _PromHistogram(
+        "sam_latency_ms",
+        "Async SAM verification latency in milliseconds",
+        buckets=(50, 100, 250, 500, 1000, 2000, 5000, float("inf"))
+    )
+except ImportError:
+    _PROM_JOBS = None
+    _PROM_LATENCY = None
+
+# Violation type by 2-bit PPE-absence key: (not has_helmet) << 1 | (not has_vest).
+# Indexing this table replaces a four-way branch that predicts poorly because
+# violations are the rare case.
+_VTYPE = (None, "no_vest", "no_helmet", "both_missing")
+
 
 @dataclass
 class SAMJob:
     """A pending SAM verification job."""
     job_id: str
     person_id: int
-    bbox: List[float]
-    image: np.ndarray          # Frame snapshot for SAM to process
+    bbox: List[float]          # Person bbox in original frame coordinates
+    image: np.ndarray          # Person ROI crop for SAM to process
     violation_type: str        # What YOLO suspected
     yolo_result: Dict[str, Any]  # Original YOLO result
-    submitted_at: float = field(default_factory=time.time)
-    completed_at: Optional[float] = None
+    # Monotonic nanoseconds — immune to wall-clock jumps (NTP, DST)
+    submitted_at: int = field(default_factory=time.monotonic_ns)
+    completed_at: Optional[int] = None
     sam_result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
     # Callback to call when SAM finishes (e.g., update DB)
     on_complete: Optional[Callable] = None
 
+    # Pinned staging buffer backing `image` (returned to the pool on completion)
+    pinned_buffer: Optional[Any] = None
+
+
+class _PinnedFramePool:
+    """
+    Pool of page-locked (pinned) host buffers for frame snapshots.
+
+    Host→device copies from pageable memory go through an extra driver-side
+    staging copy; copies from pinned memory DMA directly and can overlap
+    with compute (non_blocking=True). Staging frames here in submit() means
+    the predictor's internal .to(device) transfers hit the fast path.
+
+    Capped at max_buffers so many in-flight frames can't exhaust host RAM —
+    pinned memory is never swappable.
+    """
+
+    def __init__(self, max_buffers: int = 8):
+        self._max_buffers = max_buffers
+        self._free: Dict[tuple, list] = {}
+        self._allocated = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: tuple):
+        """Get a pinned uint8 buffer of the given shape, or None if capped."""
+        import torch
+
+        key = tuple(shape)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                return free.pop()
+            if self._allocated >= self._max_buffers:
+                return None
+            self._allocated += 1
+
+        try:
+            return torch.empty(shape, dtype=torch.uint8, pin_memory=True)
+        except Exception:
+            with self._lock:
+                self._allocated -= 1
+            return None
+
+    def release(self, buffer):
+        """Return a buffer to the pool for reuse."""
+        key = tuple(buffer.shape)
+        with self._lock:
+            self._free.setdefault(key, []).append(buffer)
+
 
 @dataclass
 class SAMVerificationResult:
@@ -109,29 +188,124 @@ class AsyncSAMVerifier:
             max_workers=max_workers,
             thread_name_prefix="sam_worker"
         )
-        self._jobs: Dict[str, SAMJob] = {}
-        self._results: Dict[str, SAMVerificationResult] = {}
-        self._lock = threading.Lock()
-        self._job_counter = 0
-
-        # Stats for thesis
-        self.stats = {
-            "jobs_submitted": 0,
-            "jobs_completed": 0,
-            "jobs_failed": 0,
-            "false_positives_caught": 0,   # YOLO said violation, SAM said safe
-            "false_negatives_caught": 0,   # YOLO said safe, SAM said violation
-            "total_sam_latency_ms": 0.0,
-            "avg_sam_latency_ms": 0.0,
+
+        # Job map is sharded so that producers submitting and readers
+        # polling don't all contend on one global lock.
+        self._num_shards = 8
+        self._shard_locks = [threading.Lock() for _ in range(self._num_shards)]
+        self._job_shards: List[Dict[str, SAMJob]] = [{} for _ in range(self._num_shards)]
+
+        # Completed results live in a fixed-size ring indexed by the
+        # monotonic counter encoded in each job_id. A list-slot store is a
+        # single GIL-atomic operation, so reads and writes need no lock,
+        # and memory stays O(capacity) regardless of uptime. Stale slots
+        # are detected by comparing the stored result's job_id.
+        self._ring_capacity = 256
+        self._result_ring: List[Optional[SAMVerificationResult]] = [None] * self._ring_capacity
+
+        # itertools.count.__next__ is atomic under the GIL — no lock needed
+        self._id_counter = itertools.count(1)
+
+        # Futures by job_id. Plain dict get/set are GIL-atomic, so
+        # wait_for/is_complete can consult these without any lock.
+        self._futures: Dict[str, Future] = {}
+
+        # Micro-batching: jobs queue up here briefly so multi-person frames
+        # share one SAM call instead of N separate launches. The consumer
+        # thread drains up to _max_batch jobs per _batch_window_s.
+        self._max_batch = 4
+        self._batch_window_s = 0.005
+        self._job_queue: "queue.SimpleQueue[Optional[SAMJob]]" = queue.SimpleQueue()
+        self._consumer_thread = threading.Thread(
+            target=self._consume_jobs,
+            name="sam_batcher",
+            daemon=True
+        )
+        self._consumer_thread.start()
+
+        # Completion side effects (the on_complete DB writes) get their own
+        # single thread, so a DB latency spike never stalls a SAM worker —
+        # max_workers SAM verifications stay in flight regardless.
+        self._completion_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="sam_complete"
+        )
+
+        # Backpressure: cap in-flight jobs so a bursty camera feed can't
+        # queue frame snapshots (megabytes each) without bound. Dropping a
+        # stale verification is safe for this pipeline — the violation
+        # cooldown window still suppresses duplicate alerts.
+        self._max_inflight = 32
+        self._inflight = threading.BoundedSemaphore(self._max_inflight)
+
+        # Pinned staging pool — only worth it when a CUDA device will be the
+        # copy target; otherwise frames stay pageable.
+        self._pinned_pool: Optional[_PinnedFramePool] = None
+        try:
+            import torch
+            if torch.cuda.is_available():
+                self._pinned_pool = _PinnedFramePool(max_buffers=4 * max_workers)
+        except ImportError:
+            pass
+
+        # Stats for thesis — plain attribute counters. Single-opcode-ish
+        # increments under the GIL are cheap and never block the submit
+        # path; a scrape in get_stats() reads a snapshot without any lock.
+        # Monitoring gauges tolerate the (theoretical) lost increment under
+        # extreme interleaving; the latency average is derived on read from
+        # a (sum, count) pair so writers never recompute it.
+        self._jobs_submitted = 0
+        self._jobs_completed = 0
+        self._jobs_failed = 0
+        self._jobs_dropped = 0            # Rejected by backpressure cap
+        self._false_positives_caught = 0  # YOLO said violation, SAM said safe
+        self._false_negatives_caught = 0  # YOLO said safe, SAM said violation
+        self._latency_sum_ms = 0.0
+        self._latency_count = 0
+        self._pending_jobs = 0            # O(1) gauge
+
+        # Background sweeper: evicts old completed jobs on a timer so
+        # nothing leaks on long uptimes even if nobody ever calls
+        # cleanup_old_jobs. With the bounded semaphore and result ring this
+        # is a safety net, not a correctness requirement.
+        self._sweep_interval_s = 60.0
+        self._shutdown_event = threading.Event()
+        self._sweeper_thread = threading.Thread(
+            target=self._sweep_loop,
+            name="sam_sweeper",
+            daemon=True
+        )
+        self._sweeper_thread.start()
+
+        # Resolve the SAM singleton once so the hot path calls pre-bound
+        # methods (no per-job sys.modules/global lookups) and any model
+        # warm-up cost lands at service start instead of on the first job.
+        from services.sam_verifier import get_sam_verifier
+        self._sam = get_sam_verifier()
+        self._verify_dispatch = {
+            "no_helmet": self._sam.verify_helmet,   # Path 2: Rescue Head
+            "no_vest": self._sam.verify_vest,       # Path 3: Rescue Body
+            "both_missing": self._sam.verify_both,  # Path 4: Critical
         }
 
         logger.info(f"AsyncSAMVerifier initialized with {max_workers} workers")
 
+    def _shard_for(self, job_id: str) -> int:
+        """Map a job ID to its shard index."""
+        return hash(job_id) % self._num_shards
+
+    def _ring_slot(self, job_id: str) -> int:
+        """Ring index from the monotonic counter encoded in the job ID."""
+        # job_id format: "sam_job_{counter}_{timestamp_ms}"
+        return int(job_id.split("_")[2]) % self._ring_capacity
+
     def _generate_job_id(self) -> str:
-        """Generate unique job ID."""
-        with self._lock:
-            self._job_counter += 1
-            return f"sam_job_{self._job_counter}_{int(time.time()*1000)}"
+        """
+        Generate unique job ID (lock-free).
+
+        Monotonic counter + PID is already unique; no clock read needed.
+        """
+        return f"sam_job_{next(self._id_counter)}_{os.getpid()}"
 
     def submit(
         self,
@@ -140,173 +314,354 @@ class AsyncSAMVerifier:
         image: np.ndarray,
         violation_type: str,
         yolo_result: Dict[str, Any],
-        on_complete: Optional[Callable[[SAMVerificationResult], None]] = None
-    ) -> str:
+        on_complete: Optional[Callable[[SAMVerificationResult], None]] = None,
+        copy_frame: bool = False
+    ) -> Optional[str]:
         """
         Submit a SAM verification job (non-blocking).
 
         YOLO has already returned its result. This submits SAM to verify
         in the background. The caller gets a job_id to check later.
 
+        At most _max_inflight jobs may be pending at once; beyond that the
+        job is dropped (returns None) rather than queued — for a real-time
+        feed a stale verification is worthless and the cooldown window
+        still protects against duplicate alerts.
+
         Args:
             person_id: Person index from YOLO
             bbox: Person bounding box [x1, y1, x2, y2]
-            image: Frame snapshot (copied to avoid mutation)
+            image: Full frame; only the person ROI is kept (see copy_frame)
             violation_type: What YOLO detected ('no_helmet', 'no_vest', 'both_missing')
             yolo_result: Full YOLO person dict
             on_complete: Callback(SAMVerificationResult) called when SAM finishes
+            copy_frame: Copy the ROI instead of aliasing the frame. Only
+                        needed if the caller mutates the frame in place
+                        after submit().
 
         Returns:
-            job_id: Use to check status/result later
+            job_id to check status/result later, or None if dropped
         """
+        # Clip the person bbox to the frame and reject degenerate boxes
+        # before taking a semaphore slot — nothing for SAM to verify.
+        h, w = image.shape[:2]
+        x1 = max(0, int(bbox[0]))
+        y1 = max(0, int(bbox[1]))
+        x2 = min(w, int(bbox[2]))
+        y2 = min(h, int(bbox[3]))
+        if x2 - x1 <= 0 or y2 - y1 <= 0:
+            logger.debug(f"Skipping SAM submit for degenerate bbox {bbox}")
+            return None
+
+        if not self._inflight.acquire(blocking=False):
+            self._jobs_dropped += 1
+            if _PROM_JOBS is not None:
+                _PROM_JOBS.labels(status="dropped").inc()
+            logger.warning(
+                f"SAM backlog full ({self._max_inflight} in flight) — "
+                f"dropping job for person {person_id}"
+            )
+            return None
+
         job_id = self._generate_job_id()
 
-        # Copy image to avoid mutation during async processing
-        image_copy = image.copy()
+        # The job carries only the person ROI, not the whole frame — SAM's
+        # sub-ROI extraction works in crop-local coordinates, so the async
+        # payload shrinks from the full HxWx3 frame to the person's area
+        # (typically <10% of it), and so do any copies and H2D transfers.
+        roi = image[y1:y2, x1:x2]
+
+        # The upstream pipeline is write-once per frame (YOLO produces a frame
+        # then moves to the next), so instead of a memcpy we hold a read-only
+        # view by default; the job entry keeps the frame alive until SAM is done.
+        pinned_buffer = None
+        if copy_frame:
+            # Prefer a pooled pinned buffer over a pageable copy: same memcpy
+            # cost now, but the predictor's H2D transfer DMAs directly.
+            if self._pinned_pool is not None and roi.dtype == np.uint8:
+                pinned_buffer = self._pinned_pool.acquire(roi.shape)
+            if pinned_buffer is not None:
+                job_image = pinned_buffer.numpy()
+                np.copyto(job_image, roi)
+            else:
+                job_image = np.ascontiguousarray(roi)
+        else:
+            job_image = roi.view()
+            job_image.flags.writeable = False
 
         job = SAMJob(
             job_id=job_id,
             person_id=person_id,
             bbox=bbox,
-            image=image_copy,
+            image=job_image,
             violation_type=violation_type,
             yolo_result=yolo_result,
-            on_complete=on_complete
+            on_complete=on_complete,
+            pinned_buffer=pinned_buffer
         )
 
-        with self._lock:
-            self._jobs[job_id] = job
-            self.stats["jobs_submitted"] += 1
-
-        # Submit to thread pool (non-blocking)
-        future = self._executor.submit(self._run_sam_job, job)
-        future.add_done_callback(lambda f: self._on_job_done(job_id, f))
+        shard = self._shard_for(job_id)
+        with self._shard_locks[shard]:
+            self._job_shards[shard][job_id] = job
+        self._jobs_submitted += 1
+        self._pending_jobs += 1
+        if _PROM_JOBS is not None:
+            _PROM_JOBS.labels(status="submitted").inc()
+
+        # Enqueue for the batching consumer (non-blocking). A manual Future
+        # stands in for the executor's so wait_for/is_complete still work.
+        # The job_id rides on the future itself — no per-job closure needed.
+        future: Future = Future()
+        future.job_id = job_id
+        self._futures[job_id] = future
+        future.add_done_callback(self._on_job_done)
+        self._job_queue.put(job)
 
         logger.debug(f"SAM job {job_id} submitted for person {person_id} ({violation_type})")
         return job_id
 
-    def _run_sam_job(self, job: SAMJob) -> SAMVerificationResult:
+    async def submit_async(
+        self,
+        person_id: int,
+        bbox: List[float],
+        image: np.ndarray,
+        violation_type: str,
+        yolo_result: Dict[str, Any],
+        on_complete: Optional[Callable[[SAMVerificationResult], None]] = None,
+        copy_frame: bool = False
+    ) -> Optional["asyncio.Future"]:
+        """
+        Submit a SAM job from async code and get an awaitable for the result.
+
+        For FastAPI/Starlette handlers that want the refined result in the
+        same request: instead of submit() + wait_for() (which parks a worker
+        thread), await the returned future — the event loop stays free to
+        serve other requests while SAM runs in the background pool.
+
+        Usage:
+            fut = await verifier.submit_async(...)
+            if fut is not None:
+                result = await fut  # SAMVerificationResult
+
+        Returns:
+            asyncio.Future resolving to SAMVerificationResult, or None if
+            the job was dropped by backpressure.
         """
-        Execute SAM verification (runs in background thread).
+        job_id = self.submit(
+            person_id=person_id,
+            bbox=bbox,
+            image=image,
+            violation_type=violation_type,
+            yolo_result=yolo_result,
+            on_complete=on_complete,
+            copy_frame=copy_frame
+        )
+        if job_id is None:
+            return None
+
+        # Bridge the thread-side Future onto the caller's event loop
+        return asyncio.wrap_future(self._futures[job_id])
 
-        This is the actual SAM call. It runs in a worker thread so it
-        doesn't block the main request/response cycle.
+    def _consume_jobs(self):
         """
-        start_time = time.time()
+        Drain submitted jobs into micro-batches (runs in its own thread).
 
+        Multi-person frames submit several jobs back-to-back; waiting a few
+        milliseconds lets them share one SAM call, amortizing per-launch
+        overhead across the batch.
+        """
+        while True:
+            job = self._job_queue.get()
+            if job is None:  # Shutdown sentinel
+                return
+
+            batch = [job]
+            deadline = time.monotonic() + self._batch_window_s
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    next_job = self._job_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_job is None:
+                    self._executor.submit(self._run_sam_batch, batch)
+                    return
+                batch.append(next_job)
+
+            self._executor.submit(self._run_sam_batch, batch)
+
+    def _run_sam_batch(self, batch: List[SAMJob]):
+        """
+        Run one SAM call for a micro-batch and fan results back to futures.
+
+        Runs in a worker thread so it doesn't block the main
+        request/response cycle.
+        """
+        if len(batch) == 1:
+            job = batch[0]
+            self._resolve(job, self._run_sam_job(job))
+            return
+
+        start_ns = time.monotonic_ns()
         try:
-            from services.sam_verifier import get_sam_verifier
-            sam = get_sam_verifier()
-
-            # Determine what SAM needs to verify based on violation type
-            has_helmet = job.yolo_result.get("has_helmet", False)
-            has_vest = job.yolo_result.get("has_vest", False)
-            yolo_was_violation = job.yolo_result.get("is_violation", True)
-
-            if job.violation_type == "no_helmet":
-                # Path 2: Rescue Head - SAM checks HEAD ROI
-                result = sam.verify_helmet(job.image, job.bbox)
-                has_helmet = result.get("helmet_found", False)
-                # has_vest stays from YOLO
-
-            elif job.violation_type == "no_vest":
-                # Path 3: Rescue Body - SAM checks TORSO ROI
-                result = sam.verify_vest(job.image, job.bbox)
-                has_vest = result.get("vest_found", False)
-                # has_helmet stays from YOLO
-
-            elif job.violation_type == "both_missing":
-                # Path 4: Critical - SAM checks both ROIs
-                result = sam.verify_both(job.image, job.bbox)
-                has_helmet = result.get("helmet_found", False)
-                has_vest = result.get("vest_found", False)
-
-            # Determine refined violation status
-            is_violation = not (has_helmet and has_vest)
-            violation_type = None
-            if is_violation:
-                if not has_helmet and not has_vest:
-                    violation_type = "both_missing"
-                elif not has_helmet:
-                    violation_type = "no_helmet"
-                else:
-                    violation_type = "no_vest"
-
-            sam_latency = (time.time() - start_time) * 1000
-
-            # Was YOLO correct?
-            yolo_was_correct = (yolo_was_violation == is_violation)
-
-            return SAMVerificationResult(
-                job_id=job.job_id,
-                person_id=job.person_id,
-                has_helmet=has_helmet,
-                has_vest=has_vest,
-                is_violation=is_violation,
-                violation_type=violation_type,
-                sam_latency_ms=sam_latency,
-                yolo_was_correct=yolo_was_correct,
-                yolo_initial_violation=yolo_was_violation
+            # Job images are person ROIs — hand SAM crop-local coordinates
+            raw_results = self._sam.verify_batch(
+                [j.image for j in batch],
+                [[0.0, 0.0, float(j.image.shape[1]), float(j.image.shape[0])] for j in batch],
+                [j.violation_type for j in batch]
             )
+            per_job_latency = (time.monotonic_ns() - start_ns) / 1e6 / len(batch)
+
+            for job, raw in zip(batch, raw_results):
+                self._resolve(job, self._merge_sam_result(job, raw, per_job_latency))
+
+        except Exception as e:
+            logger.error(f"SAM batch of {len(batch)} jobs failed: {e}")
+            per_job_latency = (time.monotonic_ns() - start_ns) / 1e6 / len(batch)
+            for job in batch:
+                self._resolve(job, self._fallback_result(job, per_job_latency))
+
+    def _resolve(self, job: SAMJob, result: SAMVerificationResult):
+        """Deliver a result to the job's future, waking any waiters."""
+        future = self._futures.get(job.job_id)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def _run_sam_job(self, job: SAMJob) -> SAMVerificationResult:
+        """
+        Execute SAM verification for a single job (runs in background thread).
+        """
+        start_ns = time.monotonic_ns()
+
+        # Pre-bind the job fields the hot path touches. The image is the
+        # person ROI, so SAM gets crop-local coordinates spanning it.
+        image = job.image
+        crop_h, crop_w = image.shape[:2]
+        local_bbox = [0.0, 0.0, float(crop_w), float(crop_h)]
+
+        try:
+            # Dispatch to the pre-bound SAM method for this violation type
+            verify = self._verify_dispatch.get(job.violation_type, self._sam.verify_both)
+            raw = verify(image, local_bbox)
+
+            sam_latency = (time.monotonic_ns() - start_ns) / 1e6
+            return self._merge_sam_result(job, raw, sam_latency)
 
         except Exception as e:
             logger.error(f"SAM job {job.job_id} failed: {e}")
-            sam_latency = (time.time() - start_time) * 1000
-
-            # On error, fall back to YOLO result
-            return SAMVerificationResult(
-                job_id=job.job_id,
-                person_id=job.person_id,
-                has_helmet=job.yolo_result.get("has_helmet", False),
-                has_vest=job.yolo_result.get("has_vest", False),
-                is_violation=job.yolo_result.get("is_violation", True),
-                violation_type=job.violation_type,
-                sam_latency_ms=sam_latency,
-                yolo_was_correct=True,  # Assume YOLO was right on error
-                yolo_initial_violation=job.yolo_result.get("is_violation", True)
-            )
+            sam_latency = (time.monotonic_ns() - start_ns) / 1e6
+            return self._fallback_result(job, sam_latency)
+
+    def _merge_sam_result(
+        self,
+        job: SAMJob,
+        raw: Dict[str, Any],
+        sam_latency_ms: float
+    ) -> SAMVerificationResult:
+        """Merge SAM's raw verification dict with YOLO's initial guess."""
+        # Start from YOLO's view; SAM only refines the fields it checked
+        yr = job.yolo_result
+        has_helmet = yr.get("has_helmet", False)
+        has_vest = yr.get("has_vest", False)
+        yolo_was_violation = yr.get("is_violation", True)
+
+        if job.violation_type == "no_helmet":
+            has_helmet = raw.get("helmet_found", False)
+            # has_vest stays from YOLO
+        elif job.violation_type == "no_vest":
+            has_vest = raw.get("vest_found", False)
+            # has_helmet stays from YOLO
+        else:
+            has_helmet = raw.get("helmet_found", False)
+            has_vest = raw.get("vest_found", False)
+
+        # Determine refined violation status (branchless table lookup)
+        key = (not has_helmet) << 1 | (not has_vest)
+        is_violation = key != 0
+        violation_type = _VTYPE[key]
+
+        return SAMVerificationResult(
+            job_id=job.job_id,
+            person_id=job.person_id,
+            has_helmet=has_helmet,
+            has_vest=has_vest,
+            is_violation=is_violation,
+            violation_type=violation_type,
+            sam_latency_ms=sam_latency_ms,
+            yolo_was_correct=(yolo_was_violation == is_violation),
+            yolo_initial_violation=yolo_was_violation
+        )
+
+    def _fallback_result(
+        self,
+        job: SAMJob,
+        sam_latency_ms: float
+    ) -> SAMVerificationResult:
+        """On SAM error, fall back to YOLO's original result."""
+        yr = job.yolo_result
+        yolo_was_violation = yr.get("is_violation", True)
+        return SAMVerificationResult(
+            job_id=job.job_id,
+            person_id=job.person_id,
+            has_helmet=yr.get("has_helmet", False),
+            has_vest=yr.get("has_vest", False),
+            is_violation=yolo_was_violation,
+            violation_type=job.violation_type,
+            sam_latency_ms=sam_latency_ms,
+            yolo_was_correct=True,  # Assume YOLO was right on error
+            yolo_initial_violation=yolo_was_violation
+        )
 
-    def _on_job_done(self, job_id: str, future: Future):
+    def _on_job_done(self, future: Future):
         """Called when a SAM job completes (in background thread)."""
+        job_id = future.job_id  # Attached in submit()
         try:
             result = future.result()
-            job = self._jobs.get(job_id)
 
-            with self._lock:
-                self._results[job_id] = result
-                self.stats["jobs_completed"] += 1
-                self.stats["total_sam_latency_ms"] += result.sam_latency_ms
-                self.stats["avg_sam_latency_ms"] = (
-                    self.stats["total_sam_latency_ms"] /
-                    max(self.stats["jobs_completed"], 1)
-                )
+            self._result_ring[self._ring_slot(job_id)] = result
 
+            shard = self._shard_for(job_id)
+            with self._shard_locks[shard]:
+                job = self._job_shards[shard].get(job_id)
                 if job:
-                    job.completed_at = time.time()
+                    job.completed_at = time.monotonic_ns()
                     job.sam_result = result
 
-                    # Track accuracy stats
-                    if not result.yolo_was_correct:
-                        if result.yolo_initial_violation and not result.is_violation:
-                            self.stats["false_positives_caught"] += 1
-                            logger.info(
-                                f"✅ SAM caught false positive for job {job_id}: "
-                                f"YOLO said violation, SAM says SAFE"
-                            )
-                        elif not result.yolo_initial_violation and result.is_violation:
-                            self.stats["false_negatives_caught"] += 1
-                            logger.info(
-                                f"⚠️ SAM caught false negative for job {job_id}: "
-                                f"YOLO said safe, SAM says VIOLATION"
-                            )
-
-            # Fire callback (e.g., update DB)
+            self._jobs_completed += 1
+            self._latency_sum_ms += result.sam_latency_ms
+            self._latency_count += 1
+            if _PROM_JOBS is not None:
+                _PROM_JOBS.labels(status="completed").inc()
+                _PROM_LATENCY.observe(result.sam_latency_ms)
+
+            # Track accuracy stats
+            if job and not result.yolo_was_correct:
+                if result.yolo_initial_violation and not result.is_violation:
+                    self._false_positives_caught += 1
+                    logger.info(
+                        f"✅ SAM caught false positive for job {job_id}: "
+                        f"YOLO said violation, SAM says SAFE"
+                    )
+                elif not result.yolo_initial_violation and result.is_violation:
+                    self._false_negatives_caught += 1
+                    logger.info(
+                        f"⚠️ SAM caught false negative for job {job_id}: "
+                        f"YOLO said safe, SAM says VIOLATION"
+                    )
+
+            # SAM is done with the frame — recycle its pinned staging buffer
+            if job and job.pinned_buffer is not None and self._pinned_pool is not None:
+                job.image = None
+                self._pinned_pool.release(job.pinned_buffer)
+                job.pinned_buffer = None
+
+            # Fire callback (e.g., update DB) on the dedicated writer thread
             if job and job.on_complete:
-                try:
-                    job.on_complete(result)
-                    logger.debug(f"SAM job {job_id} callback completed")
-                except Exception as e:
-                    logger.error(f"SAM job {job_id} callback failed: {e}")
+                self._completion_executor.submit(
+                    self._fire_callback, job.on_complete, job_id, result
+                )
 
             logger.debug(
                 f"SAM job {job_id} done in {result.sam_latency_ms:.1f}ms | "
@@ -315,23 +670,53 @@ class AsyncSAMVerifier:
             )
 
         except Exception as e:
-            with self._lock:
-                self.stats["jobs_failed"] += 1
+            self._jobs_failed += 1
+            if _PROM_JOBS is not None:
+                _PROM_JOBS.labels(status="failed").inc()
             logger.error(f"SAM job {job_id} future failed: {e}")
 
+        finally:
+            self._pending_jobs -= 1
+            self._inflight.release()
+
+    def _fire_callback(
+        self,
+        callback: Callable[[SAMVerificationResult], None],
+        job_id: str,
+        result: SAMVerificationResult
+    ):
+        """Run a completion callback (runs on the sam_complete thread)."""
+        try:
+            callback(result)
+            logger.debug(f"SAM job {job_id} callback completed")
+        except Exception as e:
+            logger.error(f"SAM job {job_id} callback failed: {e}")
+
+    def get_job(self, job_id: str) -> Optional[SAMJob]:
+        """Get a submitted job by ID (e.g., to attach a late callback)."""
+        shard = self._shard_for(job_id)
+        with self._shard_locks[shard]:
+            return self._job_shards[shard].get(job_id)
+
     def get_result(self, job_id: str) -> Optional[SAMVerificationResult]:
         """
-        Get the result of a completed SAM job.
+        Get the result of a completed SAM job (lock-free).
 
-        Returns None if job is still running.
+        Returns None if the job is still running or its ring slot has been
+        overwritten by a newer job (wrap-around).
         """
-        with self._lock:
-            return self._results.get(job_id)
+        result = self._result_ring[self._ring_slot(job_id)]
+        if result is not None and result.job_id == job_id:
+            return result
+        return None
 
     def is_complete(self, job_id: str) -> bool:
-        """Check if a SAM job has finished."""
-        with self._lock:
-            return job_id in self._results
+        """Check if a SAM job has finished (lock-free)."""
+        future = self._futures.get(job_id)
+        if future is not None:
+            return future.done()
+        # Future already cleaned up — fall back to the result ring
+        return self.get_result(job_id) is not None
 
     def wait_for(self, job_id: str, timeout: float = 10.0) -> Optional[SAMVerificationResult]:
         """
@@ -347,43 +732,83 @@ class AsyncSAMVerifier:
         Returns:
             SAMVerificationResult or None if timeout
         """
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            result = self.get_result(job_id)
-            if result is not None:
-                return result
-            time.sleep(0.05)  # Poll every 50ms
-        return None
+        future = self._futures.get(job_id)
+        if future is None:
+            # Future already cleaned up — result (if any) is in the map
+            return self.get_result(job_id)
+        try:
+            # Event-driven wait: wakes the instant the worker finishes,
+            # instead of polling on a 50ms sleep loop.
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get async SAM statistics for thesis metrics."""
-        with self._lock:
-            stats = self.stats.copy()
-            stats["pending_jobs"] = len(self._jobs) - len(self._results)
-            stats["completed_jobs"] = len(self._results)
-
-            completed = max(stats["jobs_completed"], 1)
-            stats["yolo_accuracy_rate"] = (
-                (completed - stats["false_positives_caught"] - stats["false_negatives_caught"])
-                / completed * 100
-            )
-            return stats
+        """
+        Get async SAM statistics for thesis metrics.
+
+        Lock-free snapshot: each counter is read once, derived fields are
+        computed from the snapshot, and nothing blocks submit/_on_job_done
+        — a metrics scrape costs microseconds regardless of job rate.
+        """
+        jobs_completed = self._jobs_completed
+        latency_sum = self._latency_sum_ms
+        latency_count = self._latency_count
+        fp_caught = self._false_positives_caught
+        fn_caught = self._false_negatives_caught
+
+        completed = max(jobs_completed, 1)
+        return {
+            "jobs_submitted": self._jobs_submitted,
+            "jobs_completed": jobs_completed,
+            "jobs_failed": self._jobs_failed,
+            "jobs_dropped": self._jobs_dropped,
+            "false_positives_caught": fp_caught,
+            "false_negatives_caught": fn_caught,
+            "total_sam_latency_ms": latency_sum,
+            "avg_sam_latency_ms": latency_sum / max(latency_count, 1),
+            "pending_jobs": self._pending_jobs,
+            "completed_jobs": jobs_completed,
+            "yolo_accuracy_rate": (completed - fp_caught - fn_caught) / completed * 100,
+        }
 
     def cleanup_old_jobs(self, max_age_seconds: float = 600.0):
-        """Remove old completed jobs to free memory."""
-        cutoff = time.time() - max_age_seconds
-        with self._lock:
-            old_jobs = [
-                jid for jid, job in self._jobs.items()
-                if job.completed_at and job.completed_at < cutoff
-            ]
-            for jid in old_jobs:
-                del self._jobs[jid]
-                self._results.pop(jid, None)
+        """
+        Remove old completed jobs to free memory.
+
+        Results need no cleanup — the ring overwrites itself.
+        """
+        cutoff = time.monotonic_ns() - int(max_age_seconds * 1e9)
+        for shard in range(self._num_shards):
+            with self._shard_locks[shard]:
+                jobs = self._job_shards[shard]
+                old_jobs = [
+                    jid for jid, job in jobs.items()
+                    if job.completed_at and job.completed_at < cutoff
+                ]
+                for jid in old_jobs:
+                    del jobs[jid]
+                    self._futures.pop(jid, None)
+
+    def _sweep_loop(self):
+        """Periodically evict old completed jobs (runs in a daemon thread)."""
+        # Event.wait doubles as the sleep and the shutdown signal, so
+        # shutdown() wakes this thread immediately instead of waiting out
+        # a full sleep interval.
+        while not self._shutdown_event.wait(self._sweep_interval_s):
+            try:
+                self.cleanup_old_jobs()
+            except Exception as e:
+                logger.error(f"SAM job sweep failed: {e}")
 
     def shutdown(self):
-        """Shutdown the thread pool gracefully."""
+        """Shutdown the sweeper, batching consumer, and thread pool gracefully."""
+        self._shutdown_event.set()  # Wakes the sweeper promptly
+        self._job_queue.put(None)   # Sentinel stops the consumer
+        self._sweeper_thread.join(timeout=5.0)
+        self._consumer_thread.join(timeout=5.0)
         self._executor.shutdown(wait=True)
+        self._completion_executor.shutdown(wait=True)
         logger.info("AsyncSAMVerifier shutdown complete")
 
 
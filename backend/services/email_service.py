@@ -7,15 +7,47 @@ Supports SMTP (Gmail, Outlook, etc.).
 
 import os
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from config.settings import settings
 
 
+# Email body template — compiled once at import. Keeping the text here (with
+# the separators precomputed) means the send path is a single format_map call
+# and there is exactly one place to edit the wording.
+_SEP = "=" * 40
+
+_BODY_TEMPLATE = """Dear Safety Manager,
+
+Please find attached the daily PPE compliance report for {report_date}.
+
+SUMMARY
+{sep}
+Total Detections:  {total_detections}
+Total Violations:  {total_violations}
+Compliance Rate:   {compliance_rate:.1f}%
+
+VIOLATION BREAKDOWN
+{sep}
+No Helmet:         {no_helmet_count}
+No Vest:           {no_vest_count}
+Both Missing:      {both_missing_count}
+
+Detailed evidence and analysis are included in the attached PDF report.
+
+---
+This is an automated message from the PPE Detection System.
+Please do not reply to this email.
+
+Best regards,
+Automated Safety Monitoring System
+"""
+
+
 class EmailService:
     """
     Sends automated emails with PDF attachments.
@@ -30,11 +62,52 @@ class EmailService:
         self.smtp_port = settings.smtp_port
         self.sender_email = settings.sender_email
         self.sender_password = settings.sender_password
-    
+
+        # Persistent SMTP connections — TLS handshake + AUTH cost hundreds
+        # of ms of round trips, so pay it once per session instead of per
+        # email. One connection per thread (thread-local), so parallel
+        # sends don't share a socket and no lock is needed.
+        self._tls = threading.local()
+
+        # Long-lived pool for per-recipient sends; keeping the threads
+        # alive lets their thread-local connections be reused across sends.
+        self._send_pool = ThreadPoolExecutor(
+            max_workers=4,
+            thread_name_prefix="email_send"
+        )
+
     def is_configured(self) -> bool:
         """Check if email is properly configured."""
         return bool(self.sender_email and self.sender_password)
-    
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection, upgrade to TLS, and authenticate."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        return server
+
+    def _ensure_alive(self) -> smtplib.SMTP:
+        """Return this thread's live SMTP connection, reconnecting if dropped."""
+        smtp: Optional[smtplib.SMTP] = getattr(self._tls, "smtp", None)
+        if smtp is not None:
+            try:
+                smtp.noop()
+                return smtp
+            except (smtplib.SMTPException, OSError):
+                try:
+                    smtp.close()
+                except Exception:
+                    pass
+                self._tls.smtp = None
+
+        self._tls.smtp = self._connect()
+        return self._tls.smtp
+
+    def _send(self, msg) -> None:
+        """Send a message over this thread's pooled connection."""
+        self._ensure_alive().send_message(msg)
+
     def send_daily_report(
         self,
         recipients: List[str],
@@ -67,43 +140,45 @@ class EmailService:
             return False
         
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = ', '.join(recipients)
-            msg['Subject'] = f"PPE Compliance Report - {report_date.strftime('%Y-%m-%d')}"
-            
-            # Email body
+            subject = f"PPE Compliance Report - {report_date.strftime('%Y-%m-%d')}"
             body = self._create_email_body(report_date, summary_stats)
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach PDF
+            filename = os.path.basename(pdf_path)
             with open(pdf_path, 'rb') as f:
-                pdf_attachment = MIMEApplication(f.read(), _subtype='pdf')
-                pdf_attachment.add_header(
-                    'Content-Disposition',
-                    'attachment',
-                    filename=os.path.basename(pdf_path)
-                )
-                msg.attach(pdf_attachment)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
-            
-            print(f"✅ Report emailed to {len(recipients)} recipient(s)")
-            return True
-            
-        except smtplib.SMTPAuthenticationError:
-            print("❌ Email authentication failed - check credentials")
-            return False
-            
-        except smtplib.SMTPException as e:
-            print(f"❌ Email sending failed: {e}")
-            return False
-            
+                pdf_bytes = f.read()
+
+            def send_one(recipient: str) -> bool:
+                """Build and send one message (modern EmailMessage API)."""
+                try:
+                    msg = EmailMessage()
+                    msg['From'] = self.sender_email
+                    msg['To'] = recipient
+                    msg['Subject'] = subject
+                    msg.set_content(body)
+                    msg.add_attachment(
+                        pdf_bytes,
+                        maintype='application',
+                        subtype='pdf',
+                        filename=filename
+                    )
+                    self._send(msg)
+                    return True
+                except smtplib.SMTPAuthenticationError:
+                    print("❌ Email authentication failed - check credentials")
+                    return False
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"❌ Email to {recipient} failed: {e}")
+                    return False
+
+            # One message per recipient: nobody sees the full address list,
+            # and a transient SMTP failure only loses that one recipient.
+            # SMTP send is IO-bound, so the pool overlaps the round trips —
+            # each worker thread reuses its own persistent connection.
+            results = list(self._send_pool.map(send_one, recipients))
+
+            sent = sum(results)
+            print(f"✅ Report emailed to {sent}/{len(recipients)} recipient(s)")
+            return sent > 0
+
         except Exception as e:
             print(f"❌ Unexpected email error: {e}")
             return False
@@ -113,32 +188,17 @@ class EmailService:
         report_date: date,
         stats: Dict[str, Any]
     ) -> str:
-        """Create email body text."""
-        return f"""Dear Safety Manager,
-
-Please find attached the daily PPE compliance report for {report_date.strftime('%B %d, %Y')}.
-
-SUMMARY
-{'='*40}
-Total Detections:  {stats.get('total_detections', 0)}
-Total Violations:  {stats.get('total_violations', 0)}
-Compliance Rate:   {stats.get('compliance_rate', 100):.1f}%
-
-VIOLATION BREAKDOWN
-{'='*40}
-No Helmet:         {stats.get('no_helmet_count', 0)}
-No Vest:           {stats.get('no_vest_count', 0)}
-Both Missing:      {stats.get('both_missing_count', 0)}
-
-Detailed evidence and analysis are included in the attached PDF report.
-
----
-This is an automated message from the PPE Detection System.
-Please do not reply to this email.
-
-Best regards,
-Automated Safety Monitoring System
-"""
+        """Create email body text from the module-level template."""
+        return _BODY_TEMPLATE.format(
+            report_date=report_date.strftime('%B %d, %Y'),
+            sep=_SEP,
+            total_detections=stats.get('total_detections', 0),
+            total_violations=stats.get('total_violations', 0),
+            compliance_rate=stats.get('compliance_rate', 100),
+            no_helmet_count=stats.get('no_helmet_count', 0),
+            no_vest_count=stats.get('no_vest_count', 0),
+            both_missing_count=stats.get('both_missing_count', 0),
+        )
     
     def send_test_email(self, recipient: str) -> bool:
         """
@@ -155,25 +215,20 @@ Automated Safety Monitoring System
             return False
         
         try:
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = self.sender_email
             msg['To'] = recipient
             msg['Subject'] = "PPE Detection System - Test Email"
-            
-            body = """This is a test email from the PPE Detection System.
+            msg.set_content("""This is a test email from the PPE Detection System.
 
 If you received this email, your email configuration is working correctly.
 
 Best regards,
 PPE Detection System
-"""
-            msg.attach(MIMEText(body, 'plain'))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
-            
+""")
+
+            self._send(msg)
+
             print(f"✅ Test email sent to {recipient}")
             return True
             
@@ -12,8 +12,11 @@ API: Uses SAM3SemanticPredictor from Ultralytics (not SAM() class).
 Requires: ultralytics >= 8.3.237, correct CLIP package.
 """
 
+import hashlib
+import threading
 import time
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -21,7 +24,13 @@ import numpy as np
 import cv2
 
 from config.settings import settings
-from utils.bbox_utils import extract_head_roi, extract_torso_roi, crop_roi
+from utils.bbox_utils import (
+    extract_head_roi,
+    extract_torso_roi,
+    extract_head_rois,
+    extract_torso_rois,
+    crop_roi,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -33,6 +42,11 @@ HELMET_PROMPTS = ["helmet", "hard hat", "safety helmet", "construction helmet"]
 VEST_PROMPTS = ["safety vest", "high visibility vest", "reflective vest", "hi-vis jacket"]
 PERSON_PROMPTS = ["person", "human", "worker", "man", "woman"]
 
+# Mock-mode RNG: PCG64 is noticeably cheaper per draw than the stdlib
+# Mersenne Twister, and mock verification runs once per person per frame.
+_RNG = np.random.default_rng()
+_MOCK_HIT_PROB = 0.3
+
 
 class SAMVerifier:
     """
@@ -76,6 +90,21 @@ class SAMVerifier:
         self.predictor = None
         self._is_loaded = False
         self._use_mock = False
+        self._load_lock = threading.Lock()
+
+        # Content hash of the crop currently encoded in the predictor.
+        # set_image (the ViT encoder) dominates SAM latency; verify_both /
+        # verify_ppe_on_crop query helmet and vest prompts on the SAME crop
+        # back-to-back, and video streams repeat frames — both cases reuse
+        # the encoded features instead of re-running the encoder.
+        self._encoded_crop_key: Optional[str] = None
+
+        # LRU of recent verification results keyed by crop hash. Video
+        # streams from static cameras hand SAM byte-identical crops for
+        # stationary workers frame after frame; a hit skips the encoder
+        # AND the prompt decoder, not just set_image.
+        self._result_cache: OrderedDict = OrderedDict()
+        self._result_cache_max = 64
 
         # Statistics for thesis metrics
         self._stats = {
@@ -97,10 +126,19 @@ class SAMVerifier:
 
         Note:
             Falls back to mock mode if SAM 3 is not available (e.g., CPU dev).
+            Thread-safe: a caller arriving mid-load blocks on the lock and
+            returns once the first load finishes, instead of loading twice.
         """
         if self._is_loaded:
             return True
 
+        with self._load_lock:
+            if self._is_loaded:
+                return True
+            return self._load_model_locked()
+
+    def _load_model_locked(self) -> bool:
+        """Perform the actual weight load. Caller holds _load_lock."""
         model_file = Path(self.model_path)
         if not model_file.exists():
             logger.warning(f"SAM 3 weights not found at {model_file}. Using mock mode.")
@@ -119,6 +157,7 @@ class SAMVerifier:
                 mode="predict",
                 model=str(model_file),
                 half=True,               # FP16 for faster GPU inference
+                imgsz=settings.sam_imgsz,  # Encoder FLOPs scale with size
                 verbose=False,
             )
             self.predictor = SAM3SemanticPredictor(overrides=overrides)
@@ -210,6 +249,12 @@ class SAMVerifier:
 
         Called for Path 4 (Critical): YOLO detected nothing for this person.
 
+        Both ROIs are stacked into ONE predictor call with the combined
+        prompt list, so the encoder forward runs once per person instead
+        of once per ROI; masks are attributed to helmet vs vest by their
+        predicted prompt class. Mock mode and degenerate crops fall back
+        to the two independent verifications.
+
         Args:
             full_image: Full input image (BGR, H×W×C)
             person_bbox: Person bounding box [x_min, y_min, x_max, y_max]
@@ -219,8 +264,34 @@ class SAMVerifier:
         """
         start_time = time.time()
 
-        helmet_result = self.verify_helmet(full_image, person_bbox)
-        vest_result = self.verify_vest(full_image, person_bbox)
+        if not self._is_loaded:
+            self.load_model()
+
+        head_roi = extract_head_roi(person_bbox)
+        torso_roi = extract_torso_roi(person_bbox)
+        head_crop = crop_roi(full_image, head_roi)
+        torso_crop = crop_roi(full_image, torso_roi)
+
+        fusable = (
+            not self._use_mock
+            and head_crop.size > 0 and min(head_crop.shape[:2]) >= 20
+            and torso_crop.size > 0 and min(torso_crop.shape[:2]) >= 20
+        )
+
+        if fusable:
+            helmet_result, vest_result = self._run_sam3_verification_pair(
+                head_crop, torso_crop
+            )
+            pair_ms = (time.time() - start_time) * 1000
+            self._stats["total_verifications"] += 2
+            self._stats["total_time_ms"] += pair_ms
+            if helmet_result.get("helmet_found", False):
+                self._stats["helmets_found"] += 1
+            if vest_result.get("vest_found", False):
+                self._stats["vests_found"] += 1
+        else:
+            helmet_result = self.verify_helmet(full_image, person_bbox)
+            vest_result = self.verify_vest(full_image, person_bbox)
 
         total_time = (time.time() - start_time) * 1000
 
@@ -229,11 +300,214 @@ class SAMVerifier:
             "vest_found": vest_result["vest_found"],
             "helmet_confidence": helmet_result["confidence"],
             "vest_confidence": vest_result["confidence"],
-            "head_roi": helmet_result["roi_bbox"],
-            "torso_roi": vest_result["roi_bbox"],
+            "head_roi": head_roi,
+            "torso_roi": torso_roi,
             "processing_time_ms": total_time,
         }
 
+    def _run_sam3_verification_pair(
+        self,
+        head_crop: np.ndarray,
+        torso_crop: np.ndarray
+    ) -> tuple:
+        """
+        One batched SAM 3 call for a Critical-path person's two ROIs.
+
+        Helmet prompts occupy the first class slots, vest prompts the
+        rest; each ROI's masks are filtered to its own prompt range
+        before coverage is measured, so vest concepts segmented in the
+        head crop (or vice versa) cannot inflate the coverage score.
+
+        Returns:
+            Tuple of (helmet_result, vest_result) dicts
+        """
+        try:
+            import torch
+
+            prompts = HELMET_PROMPTS + VEST_PROMPTS
+            rgb_crops = []
+            dims = []
+            for crop in (head_crop, torso_crop):
+                h, w = crop.shape[:2]
+                dims.append((w, h))
+                if max(h, w) < 64:
+                    scale = 64 / max(h, w)
+                    crop = cv2.resize(crop, None, fx=scale, fy=scale,
+                                      interpolation=cv2.INTER_LINEAR)
+                rgb_crops.append(
+                    cv2.cvtColor(np.ascontiguousarray(crop), cv2.COLOR_BGR2RGB)
+                )
+
+            with torch.inference_mode():
+                results = self.predictor(rgb_crops, text=prompts)
+
+            # Stale after a batched predict (see _run_sam3_verification_batch)
+            self._encoded_crop_key = None
+
+            helmet_result = self._analyze_masks(
+                results[0], "helmet", dims[0][0], dims[0][1],
+                class_range=(0, len(HELMET_PROMPTS))
+            )
+            vest_result = self._analyze_masks(
+                results[1], "vest", dims[1][0], dims[1][1],
+                class_range=(len(HELMET_PROMPTS), len(prompts))
+            )
+            return helmet_result, vest_result
+
+        except Exception as e:
+            logger.warning(
+                f"Fused both-ROI SAM 3 call failed ({e}); falling back to per-ROI"
+            )
+            return (
+                self._run_sam3_verification(head_crop, HELMET_PROMPTS, "helmet"),
+                self._run_sam3_verification(torso_crop, VEST_PROMPTS, "vest"),
+            )
+
+    def verify_batch(
+        self,
+        full_images: List[np.ndarray],
+        person_bboxes: List[List[float]],
+        violation_types: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Verify a micro-batch of persons in one call.
+
+        Called by the frame pipeline and the async verifier, which
+        coalesce a frame's uncertain persons so SAM is entered once per
+        batch instead of once per person.
+
+        The batch is regrouped by prompt set: every head ROI that needs
+        a helmet check goes through one predictor call with
+        HELMET_PROMPTS, every torso ROI through one call with
+        VEST_PROMPTS — so the encoder runs per batch, not per person.
+        'both_missing' persons contribute one crop to each group and get
+        a merged result shaped like verify_both's.
+
+        Args:
+            full_images: Full input images (BGR, H×W×C), one per person
+            person_bboxes: Person bounding boxes [x_min, y_min, x_max, y_max]
+            violation_types: One of 'no_helmet', 'no_vest', 'both_missing' per person
+
+        Returns:
+            List of verification result dicts, aligned with the inputs
+        """
+        # Anything that isn't a pure helmet or vest check is treated as
+        # both_missing, matching the old per-person dispatch fallback.
+        need_helmet = [
+            i for i, vt in enumerate(violation_types) if vt != "no_vest"
+        ]
+        need_vest = [
+            i for i, vt in enumerate(violation_types) if vt != "no_helmet"
+        ]
+
+        head_rois = (
+            extract_head_rois([person_bboxes[i] for i in need_helmet]).tolist()
+            if need_helmet else []
+        )
+        torso_rois = (
+            extract_torso_rois([person_bboxes[i] for i in need_vest]).tolist()
+            if need_vest else []
+        )
+
+        helmet_results = dict(zip(need_helmet, self._verify_roi_batch(
+            [full_images[i] for i in need_helmet],
+            head_rois,
+            HELMET_PROMPTS, "helmet"
+        )))
+        vest_results = dict(zip(need_vest, self._verify_roi_batch(
+            [full_images[i] for i in need_vest],
+            torso_rois,
+            VEST_PROMPTS, "vest"
+        )))
+
+        outputs = []
+        for i, vtype in enumerate(violation_types):
+            if vtype == "no_helmet":
+                outputs.append(helmet_results[i])
+            elif vtype == "no_vest":
+                outputs.append(vest_results[i])
+            else:
+                helmet_result = helmet_results[i]
+                vest_result = vest_results[i]
+                outputs.append({
+                    "helmet_found": helmet_result["helmet_found"],
+                    "vest_found": vest_result["vest_found"],
+                    "helmet_confidence": helmet_result["confidence"],
+                    "vest_confidence": vest_result["confidence"],
+                    "head_roi": helmet_result["roi_bbox"],
+                    "torso_roi": vest_result["roi_bbox"],
+                    "processing_time_ms": (
+                        helmet_result["processing_time_ms"]
+                        + vest_result["processing_time_ms"]
+                    ),
+                })
+        return outputs
+
+    def _verify_roi_batch(
+        self,
+        full_images: List[np.ndarray],
+        roi_bboxes: List[List[int]],
+        prompts: List[str],
+        item_type: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched counterpart of _verify_roi: crop and validate every ROI,
+        then run all valid crops through one SAM call.
+
+        Args:
+            full_images: Source images, one per ROI
+            roi_bboxes: ROI bounding boxes to crop
+            prompts: Text prompts shared by the whole batch
+            item_type: "helmet" or "vest"
+
+        Returns:
+            List of verification result dicts, aligned with the inputs
+        """
+        if not self._is_loaded:
+            self.load_model()
+
+        start_time = time.time()
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(full_images)
+        crops = []
+        keep = []
+        for j, (image, roi_bbox) in enumerate(zip(full_images, roi_bboxes)):
+            crop = crop_roi(image, roi_bbox)
+            if crop.size == 0 or min(crop.shape[:2]) < 20:
+                results[j] = {
+                    f"{item_type}_found": False,
+                    "confidence": 0.0,
+                    "roi_bbox": roi_bbox,
+                    "processing_time_ms": 0.0,
+                    "error": "ROI too small",
+                }
+            else:
+                crops.append(crop)
+                keep.append(j)
+
+        if crops:
+            if self._use_mock:
+                outs = [self._mock_verification(item_type) for _ in crops]
+            else:
+                outs = self._run_sam3_verification_batch(crops, prompts, item_type)
+
+            per_item_ms = (time.time() - start_time) * 1000 / len(crops)
+            for j, out in zip(keep, outs):
+                out["roi_bbox"] = roi_bboxes[j]
+                out["processing_time_ms"] = per_item_ms
+
+                self._stats["total_verifications"] += 1
+                self._stats["total_time_ms"] += per_item_ms
+                if out.get(f"{item_type}_found", False):
+                    if item_type == "helmet":
+                        self._stats["helmets_found"] += 1
+                    else:
+                        self._stats["vests_found"] += 1
+
+                results[j] = out
+
+        return results
+
     def verify_is_person(
         self,
         roi_crop: np.ndarray,
@@ -459,47 +733,51 @@ class SAMVerifier:
                 scale = 64 / max(h, w)
                 roi_crop = cv2.resize(roi_crop, None, fx=scale, fy=scale,
                                      interpolation=cv2.INTER_LINEAR)
-
-            # SAM3 expects RGB — OpenCV gives BGR. Convert.
-            roi_rgb = cv2.cvtColor(roi_crop, cv2.COLOR_BGR2RGB)
-
-            # Step 1: Set image (encodes features)
-            self.predictor.set_image(roi_rgb)
-
-            # Step 2: Query with text prompts
-            results = self.predictor(text=prompts)
+            elif not roi_crop.flags["C_CONTIGUOUS"]:
+                # crop_roi returns a zero-copy view; the predictor wants
+                # a contiguous buffer, so the copy happens only here, on
+                # the one branch that actually feeds SAM.
+                roi_crop = np.ascontiguousarray(roi_crop)
+
+            crop_key = hashlib.md5(roi_crop.tobytes()).hexdigest()
+
+            # Result LRU: byte-identical crops (static workers on video
+            # streams) skip SAM entirely
+            cache_key = (crop_key, item_type, threshold_override)
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return dict(cached)
+
+            import torch
+
+            # inference_mode disables autograd bookkeeping entirely —
+            # cheaper than no_grad for pure-inference forwards like these.
+            with torch.inference_mode():
+                # Step 1: Set image (encodes features) — skipped when this
+                # exact crop is already encoded, so consecutive prompt
+                # queries on the same crop (helmet then vest) share one
+                # encoder pass.
+                if crop_key != self._encoded_crop_key:
+                    # SAM3 expects RGB — OpenCV gives BGR. Convert.
+                    roi_rgb = cv2.cvtColor(roi_crop, cv2.COLOR_BGR2RGB)
+                    self.predictor.set_image(roi_rgb)
+                    self._encoded_crop_key = crop_key
+
+                # Step 2: Query with text prompts
+                results = self.predictor(text=prompts)
 
             # Step 3: Analyze masks
-            if not results or results[0].masks is None or len(results[0].masks.data) == 0:
-                print(f"  SAM3 {item_type}: NO MASKS returned (crop {w}x{h})")
-                return {
-                    f"{item_type}_found": False,
-                    "confidence": 0.0,
-                }
-
-            # Calculate maximum mask coverage across all returned masks.
-            # Masks may be bool OR float32 — binarise at 0.5 to handle both.
-            max_coverage = 0.0
-            for mask in results[0].masks.data:
-                mask_np = mask.cpu().numpy()
-                mask_bin = (mask_np > 0.5).astype(np.float32)
-                coverage = float(np.sum(mask_bin)) / float(mask_bin.size)
-                max_coverage = max(max_coverage, coverage)
-
-            # Check against threshold (caller can override for vest sensitivity)
-            thresh = threshold_override if threshold_override is not None else self.mask_threshold
-            found = max_coverage > thresh
-
-            print(
-                f"  SAM3 {item_type}: coverage={max_coverage:.4f} "
-                f"(thresh={thresh}) → {'FOUND ✅' if found else 'MISS ❌'} "
-                f"crop={w}x{h}"
+            result = self._analyze_masks(
+                results[0] if results else None,
+                item_type, w, h, threshold_override
             )
 
-            return {
-                f"{item_type}_found": found,
-                "confidence": float(max_coverage),
-            }
+            self._result_cache[cache_key] = dict(result)
+            if len(self._result_cache) > self._result_cache_max:
+                self._result_cache.popitem(last=False)
+
+            return result
 
         except Exception as e:
             logger.error(f"SAM 3 verification error: {e}")
@@ -510,39 +788,165 @@ class SAMVerifier:
                 "error": str(e),
             }
 
+    def _run_sam3_verification_batch(
+        self,
+        roi_crops: List[np.ndarray],
+        prompts: List[str],
+        item_type: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run SAM 3 concept segmentation on many ROI crops in one call.
+
+        All crops share the same prompt set, so the predictor is entered
+        once with the whole list and the encoder processes the batch
+        together instead of paying its latency per crop. Falls back to
+        the per-crop path if the batched call is rejected.
+
+        Args:
+            roi_crops: Cropped ROI images (BGR, H×W×C)
+            prompts: Text prompts shared by the batch
+            item_type: "helmet" or "vest"
+
+        Returns:
+            List of verification results, aligned with the crops
+        """
+        try:
+            import torch
+
+            rgb_crops = []
+            dims = []
+            for crop in roi_crops:
+                # Ensure minimum size for SAM 3 (resize small crops)
+                h, w = crop.shape[:2]
+                if max(h, w) < 64:
+                    scale = 64 / max(h, w)
+                    crop = cv2.resize(crop, None, fx=scale, fy=scale,
+                                      interpolation=cv2.INTER_LINEAR)
+                dims.append((w, h))
+                rgb_crops.append(cv2.cvtColor(
+                    np.ascontiguousarray(crop), cv2.COLOR_BGR2RGB
+                ))
+
+            with torch.inference_mode():
+                results = self.predictor(rgb_crops, text=prompts)
+
+            # The batched call goes through the standard predict path,
+            # not set_image — the interactive encoder cache is stale now.
+            self._encoded_crop_key = None
+
+            return [
+                self._analyze_masks(result, item_type, w, h)
+                for result, (w, h) in zip(results, dims)
+            ]
+
+        except Exception as e:
+            logger.warning(
+                f"Batched SAM 3 call failed ({e}); falling back to per-crop loop"
+            )
+            return [
+                self._run_sam3_verification(crop, prompts, item_type)
+                for crop in roi_crops
+            ]
+
+    def _analyze_masks(
+        self,
+        result,
+        item_type: str,
+        w: int,
+        h: int,
+        threshold_override: Optional[float] = None,
+        class_range: Optional[tuple] = None,
+    ) -> Dict[str, Any]:
+        """
+        Turn one predictor result into a found/confidence dict.
+
+        class_range optionally restricts the masks to a [lo, hi) range
+        of prompt class indices — used by the fused both-ROI call,
+        where helmet and vest prompts share one query.
+        """
+        if result is None or result.masks is None or len(result.masks.data) == 0:
+            print(f"  SAM3 {item_type}: NO MASKS returned (crop {w}x{h})")
+            return {
+                f"{item_type}_found": False,
+                "confidence": 0.0,
+            }
+
+        # Calculate maximum mask coverage across all returned masks.
+        # Masks may be bool OR float32 — binarise at 0.5 to handle both.
+        # The whole (K, H, W) reduction stays on the GPU: one mean per
+        # mask, one max, then a single scalar copy back — instead of K
+        # full-mask host transfers (each forcing a device sync).
+        data = result.masks.data
+        if class_range is not None and getattr(result, "boxes", None) is not None:
+            lo, hi = class_range
+            cls = result.boxes.cls
+            keep = (cls >= lo) & (cls < hi)
+            if not bool(keep.any()):
+                print(f"  SAM3 {item_type}: NO MASKS in prompt range (crop {w}x{h})")
+                return {
+                    f"{item_type}_found": False,
+                    "confidence": 0.0,
+                }
+            data = data[keep]
+        max_coverage = float((data > 0.5).float().mean(dim=(1, 2)).max())
+
+        # Check against threshold (caller can override for vest sensitivity)
+        thresh = threshold_override if threshold_override is not None else self.mask_threshold
+        found = max_coverage > thresh
+
+        print(
+            f"  SAM3 {item_type}: coverage={max_coverage:.4f} "
+            f"(thresh={thresh}) → {'FOUND ✅' if found else 'MISS ❌'} "
+            f"crop={w}x{h}"
+        )
+
+        return {
+            f"{item_type}_found": found,
+            "confidence": float(max_coverage),
+        }
+
     def _mock_verification(self, item_type: str) -> Dict[str, Any]:
         """
         Mock verification for development without SAM.
 
         Returns random-ish results for testing the pipeline.
         """
-        import random
-
         # Mock: 30% chance of finding the item
-        found = random.random() < 0.3
-        confidence = random.uniform(0.1, 0.8) if found else random.uniform(0.0, 0.04)
+        found = _RNG.random() < _MOCK_HIT_PROB
+        confidence = _RNG.uniform(0.1, 0.8) if found else _RNG.uniform(0.0, 0.04)
 
         return {
-            f"{item_type}_found": found,
-            "confidence": confidence,
+            f"{item_type}_found": bool(found),
+            "confidence": float(confidence),
             "mock": True,
         }
 
 
 # ── Singleton ────────────────────────────────────────────────────────────────
 _verifier_instance: Optional[SAMVerifier] = None
+_verifier_lock = threading.Lock()
 
 
 def get_sam_verifier() -> SAMVerifier:
     """
     Get or create the global SAM 3 verifier instance.
 
+    Thread-safe via double-checked locking, mirroring
+    get_hybrid_detector: concurrent first callers would otherwise race
+    on the None check and construct (and later load) two verifiers.
+    The fast path stays a single lock-free read.
+
     Returns:
         SAMVerifier instance
     """
     global _verifier_instance
 
-    if _verifier_instance is None:
-        _verifier_instance = SAMVerifier()
+    verifier = _verifier_instance
+    if verifier is None:
+        with _verifier_lock:
+            verifier = _verifier_instance
+            if verifier is None:
+                verifier = SAMVerifier()
+                _verifier_instance = verifier
 
-    return _verifier_instance
+    return verifier
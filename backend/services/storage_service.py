@@ -6,7 +6,8 @@ Provides CRUD operations and query helpers.
 """
 
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import Iterator, List, Optional, Dict, Any
 
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
@@ -14,6 +15,19 @@ from sqlalchemy import desc, func
 from database.models import Violation, DailyReport
 
 
+@lru_cache(maxsize=128)
+def _day_start(d: date) -> datetime:
+    """Midnight at the start of d. Pure function of the date, so cached —
+    the stats endpoints convert the same handful of dates on every call."""
+    return datetime(d.year, d.month, d.day)
+
+
+@lru_cache(maxsize=128)
+def _day_end(d: date) -> datetime:
+    """Midnight at the start of the day after d (exclusive upper bound)."""
+    return _day_start(d) + timedelta(days=1)
+
+
 class StorageService:
     """
     Database storage service for violations and reports.
@@ -66,10 +80,10 @@ class StorageService:
         query = self.db.query(Violation)
         
         if start_date:
-            query = query.filter(Violation.timestamp >= datetime.combine(start_date, datetime.min.time()))
+            query = query.filter(Violation.timestamp >= _day_start(start_date))
         
         if end_date:
-            query = query.filter(Violation.timestamp < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+            query = query.filter(Violation.timestamp < _day_end(end_date))
         
         if violation_type:
             query = query.filter(Violation.violation_type == violation_type)
@@ -91,10 +105,10 @@ class StorageService:
         query = self.db.query(func.count(Violation.id))
         
         if start_date:
-            query = query.filter(Violation.timestamp >= datetime.combine(start_date, datetime.min.time()))
+            query = query.filter(Violation.timestamp >= _day_start(start_date))
         
         if end_date:
-            query = query.filter(Violation.timestamp < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+            query = query.filter(Violation.timestamp < _day_end(end_date))
         
         return query.scalar()
     
@@ -103,14 +117,43 @@ class StorageService:
         today = date.today()
         return self.get_violations(start_date=today, end_date=today)
     
-    def get_unreported_violations(self, target_date: Optional[date] = None) -> List[Violation]:
-        """Get violations not yet included in a report."""
-        query = self.db.query(Violation).filter(Violation.report_sent == False)
-        
+    def get_unreported_violations(
+        self,
+        target_date: Optional[date] = None,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[Violation]:
+        """
+        Stream violations not yet included in a report.
+
+        Returns an iterator rather than a list: the unreported backlog
+        after an outage is unbounded, and .all() would materialize every
+        ORM object at once. Rows arrive in blocks of 500 (yield_per);
+        callers that really need a list can wrap it in list(...).
+
+        Args:
+            target_date: Only violations assigned to this report date
+            columns: Optional attribute names to select instead of full
+                rows (e.g. ["id", "timestamp", "violation_type"]) —
+                cuts row width when only summary fields are needed
+
+        Returns:
+            Iterator of Violation rows (or column tuples)
+        """
+        if columns:
+            query = self.db.query(*(getattr(Violation, c) for c in columns))
+        else:
+            query = self.db.query(Violation)
+
+        query = query.filter(Violation.report_sent == False)
+
         if target_date:
             query = query.filter(Violation.report_date == target_date)
-        
-        return query.order_by(Violation.timestamp).all()
+
+        return iter(
+            query.order_by(Violation.timestamp)
+            .execution_options(stream_results=True)
+            .yield_per(500)
+        )
     
     # === Report Operations ===
     
@@ -129,30 +172,17 @@ class StorageService:
     
     # === Statistics ===
     
-    def get_daily_stats(self, target_date: date) -> Dict[str, Any]:
-        """Get statistics for a specific date."""
-        violations = self.get_violations(start_date=target_date, end_date=target_date)
-        
-        total = len(violations)
-        
-        if total == 0:
-            return {
-                "date": str(target_date),
-                "total_detections": 0,
-                "total_violations": 0,
-                "compliance_rate": 100.0,
-                "no_helmet": 0,
-                "no_vest": 0,
-                "both_missing": 0
-            }
-        
-        no_helmet = sum(1 for v in violations if v.violation_type == "no_helmet")
-        no_vest = sum(1 for v in violations if v.violation_type == "no_vest")
-        both_missing = sum(1 for v in violations if v.violation_type == "both_missing")
-        
+    @staticmethod
+    def _build_day_stats(target_date: date, counts: Dict[str, int]) -> Dict[str, Any]:
+        """Pivot per-type counts for one day into the stats dict shape."""
+        no_helmet = counts.get("no_helmet", 0)
+        no_vest = counts.get("no_vest", 0)
+        both_missing = counts.get("both_missing", 0)
+
+        total = sum(counts.values())
         total_violations = no_helmet + no_vest + both_missing
         compliance_rate = ((total - total_violations) / total * 100) if total > 0 else 100.0
-        
+
         return {
             "date": str(target_date),
             "total_detections": total,
@@ -162,18 +192,51 @@ class StorageService:
             "no_vest": no_vest,
             "both_missing": both_missing
         }
-    
+
+    def get_daily_stats(self, target_date: date) -> Dict[str, Any]:
+        """
+        Get statistics for a specific date.
+
+        Counts are aggregated database-side with one GROUP BY — only
+        (type, count) tuples cross the wire instead of full rows.
+        """
+        rows = self.db.query(
+            Violation.violation_type,
+            func.count(Violation.id)
+        ).filter(
+            Violation.timestamp >= _day_start(target_date),
+            Violation.timestamp < _day_end(target_date)
+        ).group_by(Violation.violation_type).all()
+
+        return self._build_day_stats(target_date, dict(rows))
+
     def get_weekly_trend(self) -> List[Dict[str, Any]]:
-        """Get daily stats for the last 7 days."""
+        """
+        Get daily stats for the last 7 days (today first).
+
+        One query grouped by (date, violation_type) replaces the former
+        seven get_daily_stats round-trips; the pivot into per-day dicts
+        happens in Python on at most 7×3 count rows.
+        """
         today = date.today()
-        trend = []
-        
-        for i in range(7):
-            day = today - timedelta(days=i)
-            stats = self.get_daily_stats(day)
-            trend.append(stats)
-        
-        return trend
+        cutoff = _day_start(today - timedelta(days=6))
+
+        rows = self.db.query(
+            func.date(Violation.timestamp).label("day"),
+            Violation.violation_type,
+            func.count(Violation.id)
+        ).filter(
+            Violation.timestamp >= cutoff
+        ).group_by("day", Violation.violation_type).all()
+
+        per_day: Dict[str, Dict[str, int]] = {}
+        for day, vtype, count in rows:
+            per_day.setdefault(str(day), {})[vtype] = count
+
+        return [
+            self._build_day_stats(day, per_day.get(str(day), {}))
+            for day in (today - timedelta(days=i) for i in range(7))
+        ]
     
     def get_camera_stats(self, days: int = 7) -> Dict[str, int]:
         """Get violation counts by camera."""
@@ -11,15 +11,23 @@ Key Features:
 """
 
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime
 
+import numpy as np
+
+from utils._iou_numba import iou_pairwise_pre
+
 from config.settings import settings
 
+# Bbox smoothing weights (float32 so the EMA never upcasts the rows)
+_EMA_ALPHA = np.float32(0.7)  # weight of the new observation
+_EMA_BETA = np.float32(1.0) - _EMA_ALPHA
+
 
-@dataclass
+@dataclass(slots=True)
 class TrackedViolation:
     """Represents a tracked violation for a person."""
     person_id: int
@@ -30,28 +38,11 @@ class TrackedViolation:
     stored_to_db: bool = False
     screenshot_taken: bool = False
     
-    def is_in_cooldown(self, cooldown_seconds: float) -> bool:
+    def is_in_cooldown(self, cooldown_seconds: float, now: Optional[float] = None) -> bool:
         """Check if this violation is still in cooldown period."""
-        return (time.time() - self.first_detected) < cooldown_seconds
-
-
-@dataclass
-class PersonTrack:
-    """Tracks a person across multiple frames."""
-    track_id: int
-    bbox: List[float]
-    last_seen: float
-    violations: Dict[str, TrackedViolation] = field(default_factory=dict)
-    
-    def update_bbox(self, new_bbox: List[float]):
-        """Update the bounding box with smoothing."""
-        # Simple exponential moving average for stability
-        alpha = 0.7
-        self.bbox = [
-            alpha * new + (1 - alpha) * old
-            for new, old in zip(new_bbox, self.bbox)
-        ]
-        self.last_seen = time.time()
+        if now is None:
+            now = time.time()
+        return (now - self.first_detected) < cooldown_seconds
 
 
 class ViolationTracker:
@@ -97,10 +88,23 @@ class ViolationTracker:
         self.cooldown_seconds = cooldown_seconds
         self.iou_threshold = iou_threshold
         self.track_timeout_seconds = track_timeout_seconds
-        
-        # Active person tracks: track_id -> PersonTrack
-        self.tracks: Dict[int, PersonTrack] = {}
+
         self.next_track_id = 0
+
+        # Track state as parallel arrays (SoA): one contiguous row per
+        # track instead of a heap-scattered object per track, so
+        # matching, bbox updates and cleanup are all vector ops over
+        # rows [0, _count). Arrays grow by doubling; _rows maps
+        # track_id -> row and _violations carries the per-track
+        # violation state that doesn't fit a fixed-width column.
+        self._capacity = 16
+        self._count = 0
+        self._track_ids = np.zeros(self._capacity, dtype=np.int64)
+        self._bboxes = np.zeros((self._capacity, 4), dtype=np.float32)
+        self._areas = np.zeros(self._capacity, dtype=np.float32)
+        self._last_seen = np.zeros(self._capacity, dtype=np.float64)
+        self._rows: Dict[int, int] = {}
+        self._violations: Dict[int, Dict[str, TrackedViolation]] = {}
         
         # Stats for thesis
         self.stats = {
@@ -120,15 +124,17 @@ class ViolationTracker:
         Returns:
             IoU value between 0 and 1
         """
+        # Disjoint on either axis → zero overlap (cheap early exit —
+        # the common case, decided before any max/min arithmetic)
+        if (bbox1[2] <= bbox2[0] or bbox2[2] <= bbox1[0]
+                or bbox1[3] <= bbox2[1] or bbox2[3] <= bbox1[1]):
+            return 0.0
+
         x1 = max(bbox1[0], bbox2[0])
         y1 = max(bbox1[1], bbox2[1])
         x2 = min(bbox1[2], bbox2[2])
         y2 = min(bbox1[3], bbox2[3])
-        
-        # No intersection
-        if x2 <= x1 or y2 <= y1:
-            return 0.0
-        
+
         intersection = (x2 - x1) * (y2 - y1)
         
         area1 = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
@@ -137,52 +143,175 @@ class ViolationTracker:
         
         return intersection / union if union > 0 else 0.0
     
+    def _grow(self):
+        """Double the capacity of the track arrays."""
+        self._capacity *= 2
+        self._track_ids = np.resize(self._track_ids, self._capacity)
+        self._bboxes = np.resize(self._bboxes, (self._capacity, 4))
+        self._areas = np.resize(self._areas, self._capacity)
+        self._last_seen = np.resize(self._last_seen, self._capacity)
+
+    def _add_track(self, bbox: List[float], now: float) -> int:
+        """Append a new track row and return its track ID."""
+        if self._count == self._capacity:
+            self._grow()
+        row = self._count
+        track_id = self.next_track_id
+        self.next_track_id += 1
+
+        self._track_ids[row] = track_id
+        self._bboxes[row] = bbox
+        self._areas[row] = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+        self._last_seen[row] = now
+        self._rows[track_id] = row
+        self._violations[track_id] = {}
+        self._count += 1
+        return track_id
+
+    def _update_track(self, track_id: int, bbox: List[float], now: float):
+        """
+        EMA-smooth a track's bbox row in place and refresh its stamp.
+
+        Both writes land directly in the SoA row — no list build, no
+        per-element Python arithmetic, no upcast past float32.
+        """
+        idx = self._rows[track_id]
+        row = self._bboxes[idx]
+        np.multiply(row, _EMA_BETA, out=row)
+        row += _EMA_ALPHA * np.asarray(bbox, dtype=np.float32)
+        self._areas[idx] = (row[2] - row[0]) * (row[3] - row[1])
+        self._last_seen[idx] = now
+
     def _match_to_track(self, bbox: List[float]) -> Optional[int]:
         """
         Find existing track that matches this bounding box.
-        
+
+        All track IoUs are computed in one iou_pairwise call against the
+        contiguous bbox rows instead of a Python loop with one
+        _calculate_iou call per track — on crowded scenes that loop was
+        the dominant per-detection cost.
+
         Args:
             bbox: Person bounding box [x1, y1, x2, y2]
-            
+
         Returns:
             Track ID if matched, None if new person
         """
-        best_iou = 0.0
-        best_track_id = None
-        
-        for track_id, track in self.tracks.items():
-            iou = self._calculate_iou(bbox, track.bbox)
-            if iou > best_iou and iou >= self.iou_threshold:
-                best_iou = iou
-                best_track_id = track_id
-        
-        return best_track_id
-    
-    def _cleanup_old_tracks(self):
+        if self._count == 0:
+            return None
+
+        live = self._bboxes[:self._count]
+        q = np.asarray(bbox, dtype=np.float32)
+
+        # Cheap L∞ center-distance prefilter: two boxes can only overlap
+        # when their centers are closer than half the sum of their
+        # extents, so most tracks are rejected with two vector ops
+        # before any IoU arithmetic runs.
+        centers = 0.5 * (live[:, :2] + live[:, 2:])
+        sizes = (live[:, 2:] - live[:, :2]).max(axis=1)
+        qc = 0.5 * (q[:2] + q[2:])
+        qs = (q[2:] - q[:2]).max()
+        candidates = np.abs(centers - qc).max(axis=1) < 0.5 * (sizes + qs)
+        if not candidates.any():
+            return None
+
+        idx = np.nonzero(candidates)[0]
+        iou = iou_pairwise_pre(
+            q.reshape(1, 4), live[idx], self._areas[:self._count][idx]
+        )[0]
+
+        best = int(np.argmax(iou))
+        if iou[best] > 0.0 and iou[best] >= self.iou_threshold:
+            return int(self._track_ids[idx[best]])
+        return None
+
+    def match_frame(self, bboxes: np.ndarray) -> np.ndarray:
+        """
+        Match a whole frame's detections to tracks in one greedy pass.
+
+        Builds the full D×T IoU matrix with one iou_pairwise call, then
+        repeatedly takes the best remaining (detection, track) pair and
+        retires its row and column — so two nearby detections can never
+        both claim the same track, which the per-detection matcher
+        allowed. Greedy assignment on IoU is the standard tracker
+        compromise; optimal assignment would need scipy, which this
+        project doesn't depend on.
+
+        Args:
+            bboxes: (D, 4) array of detection bboxes
+
+        Returns:
+            (D,) int array of matched track IDs, -1 where unmatched
+        """
+        d = bboxes.shape[0]
+        out = np.full(d, -1, dtype=np.int64)
+        if d == 0 or self._count == 0:
+            return out
+
+        iou = iou_pairwise_pre(
+            np.asarray(bboxes, dtype=np.float32),
+            self._bboxes[:self._count],
+            self._areas[:self._count]
+        )
+        t = iou.shape[1]
+        for _ in range(min(d, t)):
+            flat = int(np.argmax(iou))
+            di, ti = divmod(flat, t)
+            if iou[di, ti] < self.iou_threshold or iou[di, ti] <= 0.0:
+                break
+            out[di] = self._track_ids[ti]
+            iou[di, :] = -1.0
+            iou[:, ti] = -1.0
+        return out
+
+    def _cleanup_old_tracks(self, now: Optional[float] = None):
         """Remove tracks that haven't been seen recently."""
-        current_time = time.time()
-        expired_tracks = [
-            track_id for track_id, track in self.tracks.items()
-            if (current_time - track.last_seen) > self.track_timeout_seconds
-        ]
-        
-        for track_id in expired_tracks:
-            del self.tracks[track_id]
+        if self._count == 0:
+            return
+        if now is None:
+            now = time.time()
+
+        # One vectorized compare over the live rows; the common case
+        # (nothing expired) costs a single all() and no compaction
+        keep = (
+            now - self._last_seen[:self._count]
+        ) <= self.track_timeout_seconds
+        if keep.all():
+            return
+
+        # Compact the surviving rows to the front
+        live_ids = self._track_ids[:self._count][keep]
+        kept = live_ids.shape[0]
+        self._track_ids[:kept] = live_ids
+        self._bboxes[:kept] = self._bboxes[:self._count][keep]
+        self._areas[:kept] = self._areas[:self._count][keep]
+        self._last_seen[:kept] = self._last_seen[:self._count][keep]
+        self._count = kept
+
+        live = {int(tid) for tid in live_ids}
+        self._violations = {
+            tid: v for tid, v in self._violations.items() if tid in live
+        }
+        self._rows = {int(tid): i for i, tid in enumerate(live_ids)}
     
     def should_store_violation(
         self,
         person: Dict[str, Any],
-        violation_type: str
+        violation_type: str,
+        now: Optional[float] = None
     ) -> Tuple[bool, Optional[str]]:
         """
         Check if this violation should be stored to database.
-        
+
         This is the main entry point for de-duplication logic.
-        
+
         Args:
             person: Person detection dict with 'bbox' key
             violation_type: Type of violation ('no_helmet', 'no_vest', 'both_missing')
-            
+            now: Frame timestamp; taken once here if the caller didn't.
+                 process_detection_result threads one reading through a
+                 whole frame instead of ~3 time.time() calls per person.
+
         Returns:
             Tuple of (should_store: bool, reason: str)
             - (True, "new_violation") - First time seeing this violation
@@ -193,62 +322,67 @@ class ViolationTracker:
         if not bbox or len(bbox) != 4:
             return True, "invalid_bbox"  # Store it anyway for safety
         
+        if now is None:
+            now = time.time()
+
         self.stats["total_violations_detected"] += 1
-        
+
         # Cleanup old tracks
-        self._cleanup_old_tracks()
-        
+        self._cleanup_old_tracks(now)
+
         # Try to match to existing track
         track_id = self._match_to_track(bbox)
-        
+
         if track_id is None:
             # New person - create track and allow storage
-            track_id = self.next_track_id
-            self.next_track_id += 1
-            
-            self.tracks[track_id] = PersonTrack(
-                track_id=track_id,
-                bbox=bbox,
-                last_seen=time.time(),
-                violations={}
-            )
+            track_id = self._add_track(bbox, now)
             self.stats["unique_persons_tracked"] += 1
         else:
-            # Existing person - update their track
-            self.tracks[track_id].update_bbox(bbox)
-        
-        track = self.tracks[track_id]
-        
-        # Check if this violation type is already tracked for this person
-        if violation_type in track.violations:
-            existing = track.violations[violation_type]
-            existing.last_seen = time.time()
+            # Existing person - smooth their bbox row (EMA) and refresh
+            self._update_track(track_id, bbox, now)
+
+        return self._decide_violation(track_id, bbox, violation_type, now)
+
+    def _decide_violation(
+        self,
+        track_id: int,
+        bbox: List[float],
+        violation_type: str,
+        now: float
+    ) -> Tuple[bool, Optional[str]]:
+        """Apply the cooldown rules for a violation on a resolved track."""
+        violations = self._violations[track_id]
+
+        # Single .get() instead of `in` + `[]` — one hash of the key
+        existing = violations.get(violation_type)
+        if existing is not None:
+            existing.last_seen = now
             existing.bbox = bbox
-            
-            if existing.is_in_cooldown(self.cooldown_seconds):
+
+            if existing.is_in_cooldown(self.cooldown_seconds, now):
                 # Still in cooldown - don't store again
                 self.stats["violations_deduplicated"] += 1
                 return False, "in_cooldown"
             else:
                 # Cooldown expired - reset and allow storage
-                track.violations[violation_type] = TrackedViolation(
+                violations[violation_type] = TrackedViolation(
                     person_id=track_id,
                     bbox=bbox,
                     violation_type=violation_type,
-                    first_detected=time.time(),
-                    last_seen=time.time(),
+                    first_detected=now,
+                    last_seen=now,
                     stored_to_db=True
                 )
                 self.stats["violations_stored"] += 1
                 return True, "cooldown_expired"
         else:
             # New violation type for this person
-            track.violations[violation_type] = TrackedViolation(
+            violations[violation_type] = TrackedViolation(
                 person_id=track_id,
                 bbox=bbox,
                 violation_type=violation_type,
-                first_detected=time.time(),
-                last_seen=time.time(),
+                first_detected=now,
+                last_seen=now,
                 stored_to_db=True
             )
             self.stats["violations_stored"] += 1
@@ -260,62 +394,90 @@ class ViolationTracker:
     ) -> Dict[str, Any]:
         """
         Process a full detection result and filter violations.
-        
+
+        The person dicts are annotated IN PLACE with should_store and
+        storage_reason — copying every dict per frame was pure allocator
+        and GC churn on long streams, and no caller needs the pristine
+        originals after this step.
+
         Args:
             detection_result: Full detection output from HybridDetector
-            
+                (its person dicts are mutated)
+
         Returns:
             Modified detection result with only NEW violations to store
         """
         persons = detection_result.get("persons", [])
         violations_to_store = []
-        all_persons_updated = []
-        
+        violations_detected = 0
+        deduplicated = 0
+
+        # One clock reading for the whole frame
+        now = time.time()
+
+        # First pass: settle the trivial cases and collect the violating
+        # persons whose tracks need resolving
+        violators = []
         for person in persons:
-            is_violation = person.get("is_violation", False)
-            violation_type = person.get("violation_type", "unknown")
-            
-            if is_violation:
-                should_store, reason = self.should_store_violation(person, violation_type)
-                
-                # Add tracking info to person
-                person_updated = person.copy()
-                person_updated["should_store"] = should_store
-                person_updated["storage_reason"] = reason
-                
-                if should_store:
-                    violations_to_store.append(person_updated)
-                
-                all_persons_updated.append(person_updated)
+            if person.get("is_violation", False):
+                violations_detected += 1
+                bbox = person.get("bbox", [])
+                if bbox and len(bbox) == 4:
+                    violators.append(person)
+                else:
+                    # Store it anyway for safety
+                    person["should_store"] = True
+                    person["storage_reason"] = "invalid_bbox"
+                    violations_to_store.append(person)
             else:
-                # Not a violation - keep as-is
-                person_updated = person.copy()
-                person_updated["should_store"] = False
-                person_updated["storage_reason"] = "not_violation"
-                all_persons_updated.append(person_updated)
-        
+                person["should_store"] = False
+                person["storage_reason"] = "not_violation"
+
+        if violators:
+            # Resolve all tracks with one greedy frame-level matching
+            # pass so close-by violators can't collapse onto one track
+            self._cleanup_old_tracks(now)
+            matches = self.match_frame(
+                np.asarray([p["bbox"] for p in violators], dtype=np.float32)
+            )
+            stats = self.stats
+            for person, track_id in zip(violators, matches.tolist()):
+                bbox = person["bbox"]
+                stats["total_violations_detected"] += 1
+                if track_id < 0:
+                    track_id = self._add_track(bbox, now)
+                    stats["unique_persons_tracked"] += 1
+                else:
+                    self._update_track(track_id, bbox, now)
+
+                should_store, reason = self._decide_violation(
+                    track_id, bbox, person.get("violation_type", "unknown"), now
+                )
+                person["should_store"] = should_store
+                person["storage_reason"] = reason
+
+                if should_store:
+                    violations_to_store.append(person)
+                deduplicated += reason == "in_cooldown"
+
         # Return modified result
         result = detection_result.copy()
-        result["persons"] = all_persons_updated
         result["violations_to_store"] = violations_to_store
         result["tracking_stats"] = {
             "total_persons": len(persons),
-            "violations_detected": sum(1 for p in persons if p.get("is_violation")),
+            "violations_detected": violations_detected,
             "violations_to_store": len(violations_to_store),
-            "violations_deduplicated": sum(
-                1 for p in all_persons_updated
-                if p.get("storage_reason") == "in_cooldown"
-            ),
-            "active_tracks": len(self.tracks)
+            "violations_deduplicated": deduplicated,
+            "active_tracks": self._count
         }
-        
+
         return result
     
     def get_stats(self) -> Dict[str, Any]:
         """Get tracking statistics for thesis metrics."""
         return {
             **self.stats,
-            "active_tracks": len(self.tracks),
+            "active_tracks": self._count,
             "deduplication_rate": (
                 self.stats["violations_deduplicated"] / 
                 max(self.stats["total_violations_detected"], 1) * 100
@@ -324,7 +486,9 @@ class ViolationTracker:
     
     def reset(self):
         """Reset all tracking state."""
-        self.tracks.clear()
+        self._count = 0
+        self._rows.clear()
+        self._violations.clear()
         self.next_track_id = 0
         self.stats = {
             "total_violations_detected": 0,
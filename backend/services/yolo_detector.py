@@ -13,9 +13,11 @@ Classes detected by the model:
 """
 
 import time
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import cv2
 import numpy as np
 from ultralytics import YOLO
 
@@ -40,6 +42,9 @@ PPE_ABSENCE_CLASSES = {"no_helmet", "no_vest"}
 # Person class ID in the new model
 PERSON_CLASS_ID = 2
 
+# Bound once at import — per-inference pydantic attribute lookups add up
+_YOLO_IMGSZ = int(settings.yolo_imgsz)
+
 
 class YOLODetector:
     """
@@ -76,23 +81,55 @@ class YOLODetector:
         import torch
         _default = "cuda" if torch.cuda.is_available() else "cpu"
         self.device = device or _default
-        
+
+        # Dedicated CUDA stream for YOLO kernels. SAM verification runs
+        # on the default stream from the verifier threads; issuing YOLO
+        # work on its own stream lets the two overlap on the GPU instead
+        # of serializing behind each other.
+        self._stream = (
+            torch.cuda.Stream()
+            if self.device.startswith("cuda") and torch.cuda.is_available()
+            else None
+        )
+
+        # FP16 on CUDA: halves activation bandwidth and uses Tensor
+        # Cores; SAM already loads with half=True, this matches it.
+        self._half = self._stream is not None
+
         self.model: Optional[YOLO] = None
         self._is_loaded = False
+        self._load_lock = threading.Lock()
+
+        # Lowercase class names indexed directly by class id — built once
+        # at model load so the parse loop does a list index instead of a
+        # dict probe plus .lower() per detection
+        self._lc_names: List[str] = []
     
     def load_model(self) -> bool:
         """
         Load YOLO model from weights file.
-        
+
+        Thread-safe via double-checked locking, mirroring
+        SAMVerifier.load_model: the background preload and a first
+        request can call this concurrently, and two unguarded loads
+        would double GPU memory and tear model/_lc_names state.
+
         Returns:
             True if model loaded successfully
-            
+
         Raises:
             FileNotFoundError: If model weights not found
         """
         if self._is_loaded:
             return True
-        
+
+        with self._load_lock:
+            if self._is_loaded:
+                return True
+            return self._load_model_locked()
+
+    def _load_model_locked(self) -> bool:
+        """Perform the actual weight load. Caller holds _load_lock."""
         model_path = Path(self.model_path)
         if not model_path.exists():
             raise FileNotFoundError(
@@ -102,6 +139,11 @@ class YOLODetector:
         
         try:
             self.model = YOLO(str(model_path))
+            names = self.model.names or {}
+            self._lc_names = [
+                names.get(i, f"unknown_{i}").lower()
+                for i in range(max(names) + 1 if names else 0)
+            ]
             self._is_loaded = True
             print(f"✅ YOLO model loaded from {model_path}")
             return True
@@ -138,14 +180,28 @@ class YOLODetector:
         start_time = time.time()
         
         # Run YOLO inference at training resolution
-        results = self.model(
-            image,
-            conf=self.confidence_threshold,
-            imgsz=settings.yolo_imgsz,  # Must match training resolution (640)
-            verbose=False,
-            device=self.device
-        )
-        
+        if self._stream is not None:
+            import torch
+            with torch.cuda.stream(self._stream):
+                results = self.model(
+                    image,
+                    conf=self.confidence_threshold,
+                    imgsz=_YOLO_IMGSZ,  # Must match training resolution (640)
+                    verbose=False,
+                    device=self.device,
+                    half=self._half
+                )
+            # Results are consumed on the CPU below — sync only our stream
+            self._stream.synchronize()
+        else:
+            results = self.model(
+                image,
+                conf=self.confidence_threshold,
+                imgsz=_YOLO_IMGSZ,  # Must match training resolution (640)
+                verbose=False,
+                device=self.device
+            )
+
         inference_time = (time.time() - start_time) * 1000  # ms
         
         # Parse results
@@ -166,6 +222,103 @@ class YOLODetector:
         
         return result
     
+    def preprocess_batch(self, images: List[np.ndarray]):
+        """
+        Preprocess a batch of BGR images into a single (B, 3, H, W) tensor.
+
+        Uses cv2.dnn.blobFromImages, which fuses resize + BGR→RGB swap +
+        1/255 scaling + NHWC→NCHW into one SIMD-optimized C++ pass instead
+        of N per-image Python-level pipelines.
+
+        Args:
+            images: List of BGR images (H×W×C, uint8)
+
+        Returns:
+            Contiguous float32 torch tensor of shape (B, 3, imgsz, imgsz)
+        """
+        import torch
+
+        blob = cv2.dnn.blobFromImages(
+            images,
+            scalefactor=1 / 255.0,
+            size=(_YOLO_IMGSZ, _YOLO_IMGSZ),
+            swapRB=True,
+            crop=False
+        )
+        return torch.from_numpy(blob)
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run detection on a batch of images with a single YOLO forward pass.
+
+        Preprocessing goes through preprocess_batch (one blobFromImages call),
+        so the whole batch costs one inference launch instead of N.
+
+        Args:
+            images: List of BGR images (H×W×C)
+
+        Returns:
+            List of per-image detection dicts (same shape as detect())
+        """
+        if not self._is_loaded:
+            self.load_model()
+
+        if not images:
+            return []
+
+        start_time = time.time()
+
+        if self._stream is not None:
+            import torch
+            with torch.cuda.stream(self._stream):
+                batch = self.preprocess_batch(images).to(self.device)
+                results = self.model(
+                    batch,
+                    conf=self.confidence_threshold,
+                    verbose=False,
+                    device=self.device,
+                    half=self._half
+                )
+            self._stream.synchronize()
+        else:
+            batch = self.preprocess_batch(images).to(self.device)
+            results = self.model(
+                batch,
+                conf=self.confidence_threshold,
+                verbose=False,
+                device=self.device
+            )
+
+        inference_time = (time.time() - start_time) * 1000
+        per_image_ms = inference_time / len(images)
+
+        outputs = []
+        for image, result in zip(images, results):
+            persons, ppe_items = self._parse_results(result)
+
+            # Boxes come back in model-input (imgsz) space because we fed a
+            # raw tensor — rescale to the original image resolution.
+            h, w = image.shape[:2]
+            sx = w / _YOLO_IMGSZ
+            sy = h / _YOLO_IMGSZ
+            for det in persons + ppe_items:
+                x1, y1, x2, y2 = det["bbox"]
+                det["bbox"] = [x1 * sx, y1 * sy, x2 * sx, y2 * sy]
+
+            persons_with_ppe = self._associate_ppe_with_persons(persons, ppe_items)
+
+            outputs.append({
+                "persons": persons_with_ppe,
+                "ppe_items": ppe_items,
+                "inference_time_ms": per_image_ms,
+                "total_detections": len(persons) + len(ppe_items)
+            })
+
+        return outputs
+
     def _parse_results(
         self,
         result
@@ -185,33 +338,45 @@ class YOLODetector:
         if result.boxes is None:
             return persons, ppe_items
         
-        boxes = result.boxes.xyxy.cpu().numpy()
-        confidences = result.boxes.conf.cpu().numpy()
-        class_ids = result.boxes.cls.cpu().numpy().astype(int)
-        
-        # Get the actual class names from the trained model weights (dynamic, not hardcoded)
-        model_names = self.model.names
-        
-        for i, (box, conf, cls_id) in enumerate(zip(boxes, confidences, class_ids)):
-            bbox = box.tolist()  # [x_min, y_min, x_max, y_max]
-            
-            # Dynamically get the name from the model and force lowercase for safe mapping
-            raw_name = model_names.get(cls_id, f"unknown_{cls_id}").lower()
-            
+        # Single GPU→CPU readback: boxes.data is one (N, 6) tensor of
+        # xyxy, conf, cls — reading xyxy/conf/cls separately paid three
+        # device syncs and three copies per frame
+        data = result.boxes.data.cpu().numpy()
+        if data.shape[0] == 0:
+            return persons, ppe_items
+
+        # Bulk-convert each column once — per-row ndarray indexing and
+        # float() boxing in the loop cost more than the dicts themselves.
+        # bbox stays a plain list: it goes straight into the JSON payload.
+        bboxes = data[:, :4].astype(np.float32, copy=False).tolist()
+        confidences = data[:, 4].tolist()
+        class_ids = data[:, 5].astype(int).tolist()
+
+        lc_names = self._lc_names
+        n_names = len(lc_names)
+
+        for i, cls_id in enumerate(class_ids):
+            # Names come from the model weights (dynamic, not hardcoded),
+            # flattened to a list at load time for direct indexing
+            raw_name = (
+                lc_names[cls_id] if 0 <= cls_id < n_names
+                else f"unknown_{cls_id}"
+            )
+
             detection = {
                 "id": i,
-                "bbox": bbox,
-                "confidence": float(conf),
-                "class_id": int(cls_id),
+                "bbox": bboxes[i],
+                "confidence": confidences[i],
+                "class_id": cls_id,
                 "class_name": raw_name
             }
-            
+
             # Check by name, not by hardcoded ID
             if raw_name == "person":
                 persons.append(detection)
             else:
                 ppe_items.append(detection)
-        
+
         return persons, ppe_items
     
     def _associate_ppe_with_persons(
@@ -226,55 +391,71 @@ class YOLODetector:
         - The PPE bbox overlaps with the person's EXPANDED bbox
         - The expanded bbox catches helmets that float slightly above the person
         
+        All M×N containment ratios are computed in one NumPy broadcast
+        instead of a nested Python loop that re-ran the same max/min math
+        through is_inside_bbox and _calculate_overlap per pair.
+
         Args:
             persons: List of person detections
             ppe_items: List of PPE item detections
-            
+
         Returns:
             Updated persons list with PPE associations
         """
-        from utils.bbox_utils import is_inside_bbox, expand_bbox
-        
         for person in persons:
             person["helmet_detected"] = False
             person["vest_detected"] = False
             person["no_helmet_detected"] = False
             person["no_vest_detected"] = False
             person["associated_ppe"] = []
-        
-        for ppe in ppe_items:
-            ppe_bbox = ppe["bbox"]
+
+        if not persons or not ppe_items:
+            return persons
+
+        # Expand person bboxes by 20% to catch floating helmets above head
+        # (same math as expand_bbox, vectorized; trunc matches its int())
+        p = np.asarray([person["bbox"] for person in persons], dtype=np.float32)
+        pw = (p[:, 2] - p[:, 0]) * 0.2
+        ph = (p[:, 3] - p[:, 1]) * 0.2
+        expanded = np.trunc(np.stack(
+            [p[:, 0] - pw, p[:, 1] - ph, p[:, 2] + pw, p[:, 3] + ph], axis=1
+        ))
+
+        q = np.asarray([ppe["bbox"] for ppe in ppe_items], dtype=np.float32)
+        tl = np.maximum(q[:, None, :2], expanded[None, :, :2])
+        br = np.minimum(q[:, None, 2:], expanded[None, :, 2:])
+        wh = np.clip(br - tl, 0.0, None)
+        inter = wh[..., 0] * wh[..., 1]
+
+        # Containment ratio: fraction of the PPE bbox inside each person
+        ppe_area = (q[:, 2] - q[:, 0]) * (q[:, 3] - q[:, 1])
+        ratio = np.divide(
+            inter, ppe_area[:, None],
+            out=np.zeros_like(inter), where=ppe_area[:, None] > 0
+        )
+
+        best_idx = np.argmax(ratio, axis=1)
+        best_ratio = ratio[np.arange(len(ppe_items)), best_idx]
+
+        for i, ppe in enumerate(ppe_items):
+            # Low threshold so even grazing helmets count
+            if best_ratio[i] < 0.01:
+                continue
+
+            best_person = persons[int(best_idx[i])]
+            best_person["associated_ppe"].append(ppe)
+
+            # Map model class names to detection flags (lowercase from _parse_results)
             ppe_class = ppe["class_name"]
-            best_person = None
-            best_overlap = 0.0
-            
-            for person in persons:
-                person_bbox = person["bbox"]
-                
-                # Expand person bbox by 20% to catch floating helmets above head
-                expanded_person_bbox = expand_bbox(person_bbox, expand_ratio=0.2)
-                
-                # Use expanded box with low threshold so even grazing helmets count
-                if is_inside_bbox(ppe_bbox, expanded_person_bbox, threshold=0.01):
-                    # Calculate overlap for ranking
-                    overlap = self._calculate_overlap(ppe_bbox, expanded_person_bbox)
-                    if overlap > best_overlap:
-                        best_overlap = overlap
-                        best_person = person
-            
-            if best_person is not None:
-                best_person["associated_ppe"].append(ppe)
-                
-                # Map model class names to detection flags (lowercase from _parse_results)
-                if ppe_class == "helmet":
-                    best_person["helmet_detected"] = True
-                elif ppe_class == "vest":
-                    best_person["vest_detected"] = True
-                elif ppe_class == "no-helmet":
-                    best_person["no_helmet_detected"] = True
-                elif ppe_class == "no-vest":
-                    best_person["no_vest_detected"] = True
-        
+            if ppe_class == "helmet":
+                best_person["helmet_detected"] = True
+            elif ppe_class == "vest":
+                best_person["vest_detected"] = True
+            elif ppe_class == "no-helmet":
+                best_person["no_helmet_detected"] = True
+            elif ppe_class == "no-vest":
+                best_person["no_vest_detected"] = True
+
         return persons
     
     def _calculate_overlap(
@@ -283,14 +464,17 @@ class YOLODetector:
         outer_bbox: List[float]
     ) -> float:
         """Calculate what fraction of inner bbox is inside outer bbox."""
+        # Disjoint on either axis → zero overlap (cheap early exit —
+        # most person×PPE pairs in a frame don't overlap at all)
+        if (inner_bbox[2] <= outer_bbox[0] or outer_bbox[2] <= inner_bbox[0]
+                or inner_bbox[3] <= outer_bbox[1] or outer_bbox[3] <= inner_bbox[1]):
+            return 0.0
+
         x_min = max(inner_bbox[0], outer_bbox[0])
         y_min = max(inner_bbox[1], outer_bbox[1])
         x_max = min(inner_bbox[2], outer_bbox[2])
         y_max = min(inner_bbox[3], outer_bbox[3])
-        
-        if x_max <= x_min or y_max <= y_min:
-            return 0.0
-        
+
         intersection = (x_max - x_min) * (y_max - y_min)
         inner_area = (inner_bbox[2] - inner_bbox[0]) * (inner_bbox[3] - inner_bbox[1])
         
@@ -306,18 +490,29 @@ class YOLODetector:
 
 # Global detector instance (singleton pattern)
 _detector_instance: Optional[YOLODetector] = None
+_detector_lock = threading.Lock()
 
 
 def get_yolo_detector() -> YOLODetector:
     """
     Get or create the global YOLO detector instance.
-    
+
+    Thread-safe via double-checked locking, mirroring get_sam_verifier:
+    the background preload and a first request can race on the None
+    check and construct two detectors. The fast path stays a single
+    lock-free read.
+
     Returns:
         YOLODetector instance
     """
     global _detector_instance
-    
-    if _detector_instance is None:
-        _detector_instance = YOLODetector()
-    
-    return _detector_instance
+
+    detector = _detector_instance
+    if detector is None:
+        with _detector_lock:
+            detector = _detector_instance
+            if detector is None:
+                detector = YOLODetector()
+                _detector_instance = detector
+
+    return detector
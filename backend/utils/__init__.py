@@ -2,9 +2,12 @@
 from .bbox_utils import (
     extract_head_roi,
     extract_torso_roi,
+    extract_head_rois,
+    extract_torso_rois,
     calculate_iou,
     is_inside_bbox,
-    expand_bbox
+    expand_bbox,
+    expand_bboxes
 )
 from .visualization import draw_detections, draw_single_bbox
 from .metrics import calculate_metrics
@@ -12,9 +15,12 @@ from .metrics import calculate_metrics
 __all__ = [
     "extract_head_roi",
     "extract_torso_roi",
+    "extract_head_rois",
+    "extract_torso_rois",
     "calculate_iou",
     "is_inside_bbox",
     "expand_bbox",
+    "expand_bboxes",
     "draw_detections",
     "draw_single_bbox",
     "calculate_metrics"
@@ -0,0 +1,102 @@
+"""
+Compiled IoU Kernels
+
+Scalar and pairwise IoU over [x_min, y_min, x_max, y_max] boxes. With
+numba installed the kernels compile to tight native loops (disk-cached
+across runs); without it, NumPy fallbacks keep the same signatures so
+callers never branch on the dependency.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def iou_xyxy(a0, a1, a2, a3, b0, b1, b2, b3):
+        # Branchless clamp: whether a pair overlaps is unpredictable,
+        # so max(0, ...) lowers to vmaxss instead of a mispredicting
+        # branch. The union > 0 test is near-always true and predicts.
+        iw = max(0.0, min(a2, b2) - max(a0, b0))
+        ih = max(0.0, min(a3, b3) - max(a1, b1))
+        inter = iw * ih
+        union = (a2 - a0) * (a3 - a1) + (b2 - b0) * (b3 - b1) - inter
+        if union <= 0.0:
+            return 0.0
+        return inter / union
+
+    @njit(cache=True, fastmath=True)
+    def iou_pairwise(A, B):
+        n = A.shape[0]
+        m = B.shape[0]
+        out = np.zeros((n, m), dtype=np.float64)
+        for i in range(n):
+            a0, a1, a2, a3 = A[i, 0], A[i, 1], A[i, 2], A[i, 3]
+            area_a = (a2 - a0) * (a3 - a1)
+            for j in range(m):
+                b0, b1, b2, b3 = B[j, 0], B[j, 1], B[j, 2], B[j, 3]
+                # Branchless clamp (see iou_xyxy) keeps the inner loop
+                # free of data-dependent branches
+                iw = max(0.0, min(a2, b2) - max(a0, b0))
+                ih = max(0.0, min(a3, b3) - max(a1, b1))
+                inter = iw * ih
+                union = area_a + (b2 - b0) * (b3 - b1) - inter
+                if union > 0.0:
+                    out[i, j] = inter / union
+        return out
+    @njit(cache=True, fastmath=True)
+    def iou_pairwise_pre(A, B, area_b):
+        # Variant of iou_pairwise for callers that persist B across
+        # frames (tracks) and can hand in its areas precomputed —
+        # saves two multiplies per pair in the inner loop
+        n = A.shape[0]
+        m = B.shape[0]
+        out = np.zeros((n, m), dtype=np.float64)
+        for i in range(n):
+            a0, a1, a2, a3 = A[i, 0], A[i, 1], A[i, 2], A[i, 3]
+            area_a = (a2 - a0) * (a3 - a1)
+            for j in range(m):
+                iw = max(0.0, min(a2, B[j, 2]) - max(a0, B[j, 0]))
+                ih = max(0.0, min(a3, B[j, 3]) - max(a1, B[j, 1]))
+                inter = iw * ih
+                union = area_a + area_b[j] - inter
+                if union > 0.0:
+                    out[i, j] = inter / union
+        return out
+else:
+    def iou_xyxy(a0, a1, a2, a3, b0, b1, b2, b3):
+        if a2 <= b0 or b2 <= a0 or a3 <= b1 or b3 <= a1:
+            return 0.0
+        iw = min(a2, b2) - max(a0, b0)
+        ih = min(a3, b3) - max(a1, b1)
+        inter = iw * ih
+        union = (a2 - a0) * (a3 - a1) + (b2 - b0) * (b3 - b1) - inter
+        if union <= 0.0:
+            return 0.0
+        return inter / union
+
+    def iou_pairwise(A, B):
+        tl = np.maximum(A[:, None, :2], B[None, :, :2])
+        br = np.minimum(A[:, None, 2:], B[None, :, 2:])
+        wh = np.clip(br - tl, 0.0, None)
+        inter = wh[..., 0] * wh[..., 1]
+        area_a = (A[:, 2] - A[:, 0]) * (A[:, 3] - A[:, 1])
+        area_b = (B[:, 2] - B[:, 0]) * (B[:, 3] - B[:, 1])
+        union = area_a[:, None] + area_b[None, :] - inter
+        return np.divide(inter, union, out=np.zeros_like(inter),
+                         where=union > 0)
+
+    def iou_pairwise_pre(A, B, area_b):
+        tl = np.maximum(A[:, None, :2], B[None, :, :2])
+        br = np.minimum(A[:, None, 2:], B[None, :, 2:])
+        wh = np.clip(br - tl, 0.0, None)
+        inter = wh[..., 0] * wh[..., 1]
+        area_a = (A[:, 2] - A[:, 0]) * (A[:, 3] - A[:, 1])
+        union = area_a[:, None] + area_b[None, :] - inter
+        return np.divide(inter, union, out=np.zeros_like(inter),
+                         where=union > 0)
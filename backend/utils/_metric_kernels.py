@@ -0,0 +1,49 @@
+"""
+Compiled Metric Kernels
+
+Confusion-matrix counting over 0/1 uint8 arrays. With numba installed
+the counts come from one fused native loop (LLVM auto-vectorizes the
+four accumulators); without it, a packed-bitmask NumPy fallback keeps
+the same signature, so callers never branch on the dependency.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def confusion_u8(p, g):
+        n = p.shape[0]
+        tp = 0
+        fp = 0
+        fn = 0
+        for i in range(n):
+            pi = p[i]
+            gi = g[i]
+            tp += pi & gi
+            fp += pi & (1 - gi)
+            fn += (1 - pi) & gi
+        return tp, fp, fn, n - tp - fp - fn
+else:
+    # Popcount lookup table: number of set bits per byte value
+    _POPCNT = np.array(
+        [bin(i).count("1") for i in range(256)], dtype=np.uint16
+    )
+
+    def confusion_u8(p, g):
+        # Packed bitmasks: 8x less memory traffic than byte-per-bool,
+        # counted with one vectorized LUT gather per array. The zero
+        # bits packbits pads with never set a bit, so counts are exact.
+        n = p.shape[0]
+        pa = np.packbits(p)
+        ga = np.packbits(g)
+        tp = int(_POPCNT[pa & ga].sum())
+        fp = int(_POPCNT[pa].sum()) - tp
+        fn = int(_POPCNT[ga].sum()) - tp
+        return tp, fp, fn, n - tp - fp - fn
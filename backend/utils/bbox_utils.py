@@ -11,6 +11,21 @@ from typing import List, Tuple
 import numpy as np
 
 from config.settings import settings
+from utils._iou_numba import iou_xyxy
+
+# Bound once at import: each settings attribute access walks pydantic's
+# descriptor chain, which adds up in per-person ROI extraction. These
+# ratios are fixed for the process lifetime.
+_HEAD_RATIO = float(settings.head_roi_ratio)
+_TORSO_START = float(settings.torso_roi_start)
+
+# numba is optional — when present, the bulk person filter compiles to
+# a tight native loop; otherwise a vectorized NumPy fallback is used.
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
 
 
 def extract_head_roi(person_bbox: List[float]) -> List[int]:
@@ -32,7 +47,7 @@ def extract_head_roi(person_bbox: List[float]) -> List[int]:
     """
     x_min, y_min, x_max, y_max = person_bbox
     height = y_max - y_min
-    head_y_max = int(y_min + height * settings.head_roi_ratio)
+    head_y_max = int(y_min + height * _HEAD_RATIO)
     
     return [int(x_min), int(y_min), int(x_max), head_y_max]
 
@@ -56,11 +71,51 @@ def extract_torso_roi(person_bbox: List[float]) -> List[int]:
     """
     x_min, y_min, x_max, y_max = person_bbox
     height = y_max - y_min
-    torso_y_min = int(y_min + height * settings.torso_roi_start)
+    torso_y_min = int(y_min + height * _TORSO_START)
     
     return [int(x_min), torso_y_min, int(x_max), int(y_max)]
 
 
+def extract_head_rois(person_bboxes) -> np.ndarray:
+    """
+    Batched extract_head_roi over many person bboxes at once.
+
+    Same numerics as the scalar version (int truncation included),
+    computed with a handful of C-level ops instead of one Python call
+    per person.
+
+    Args:
+        person_bboxes: (N, 4) array-like of [x_min, y_min, x_max, y_max]
+
+    Returns:
+        (N, 4) int array of head ROIs [x_min, y_min, x_max, head_y_max]
+    """
+    b = np.asarray(person_bboxes, dtype=np.float32).reshape(-1, 4)
+    out = np.empty(b.shape, dtype=np.int64)
+    # int-array assignment truncates toward zero, matching int()
+    out[:, :3] = b[:, :3]
+    out[:, 3] = b[:, 1] + (b[:, 3] - b[:, 1]) * _HEAD_RATIO
+    return out
+
+
+def extract_torso_rois(person_bboxes) -> np.ndarray:
+    """
+    Batched extract_torso_roi over many person bboxes at once.
+
+    Args:
+        person_bboxes: (N, 4) array-like of [x_min, y_min, x_max, y_max]
+
+    Returns:
+        (N, 4) int array of torso ROIs [x_min, torso_y_min, x_max, y_max]
+    """
+    b = np.asarray(person_bboxes, dtype=np.float32).reshape(-1, 4)
+    out = np.empty(b.shape, dtype=np.int64)
+    out[:, 0] = b[:, 0]
+    out[:, 1] = b[:, 1] + (b[:, 3] - b[:, 1]) * _TORSO_START
+    out[:, 2:] = b[:, 2:]
+    return out
+
+
 def calculate_iou(bbox1: List[float], bbox2: List[float]) -> float:
     """
     Calculate Intersection over Union (IoU) between two bboxes.
@@ -72,27 +127,12 @@ def calculate_iou(bbox1: List[float], bbox2: List[float]) -> float:
     Returns:
         IoU value between 0 and 1
     """
-    # Get intersection coordinates
-    x_min = max(bbox1[0], bbox2[0])
-    y_min = max(bbox1[1], bbox2[1])
-    x_max = min(bbox1[2], bbox2[2])
-    y_max = min(bbox1[3], bbox2[3])
-    
-    # Calculate intersection area
-    if x_max <= x_min or y_max <= y_min:
-        return 0.0
-    
-    intersection = (x_max - x_min) * (y_max - y_min)
-    
-    # Calculate union area
-    area1 = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
-    area2 = (bbox2[2] - bbox2[0]) * (bbox2[3] - bbox2[1])
-    union = area1 + area2 - intersection
-    
-    if union <= 0:
-        return 0.0
-    
-    return intersection / union
+    # Delegate to the compiled kernel (native loop under numba, plain
+    # Python otherwise) — it keeps the disjoint-axis early exit.
+    return iou_xyxy(
+        float(bbox1[0]), float(bbox1[1]), float(bbox1[2]), float(bbox1[3]),
+        float(bbox2[0]), float(bbox2[1]), float(bbox2[2]), float(bbox2[3]),
+    )
 
 
 def is_inside_bbox(inner: List[float], outer: List[float], threshold: float = 0.5) -> bool:
@@ -110,15 +150,17 @@ def is_inside_bbox(inner: List[float], outer: List[float], threshold: float = 0.
     Returns:
         True if inner is inside outer with sufficient overlap
     """
-    # Get intersection
+    # Disjoint on either axis → no overlap (cheap early exit)
+    if (inner[2] <= outer[0] or outer[2] <= inner[0]
+            or inner[3] <= outer[1] or outer[3] <= inner[1]):
+        return False
+
+    # Get intersection (overlap guaranteed by the check above)
     x_min = max(inner[0], outer[0])
     y_min = max(inner[1], outer[1])
     x_max = min(inner[2], outer[2])
     y_max = min(inner[3], outer[3])
-    
-    if x_max <= x_min or y_max <= y_min:
-        return False
-    
+
     intersection = (x_max - x_min) * (y_max - y_min)
     inner_area = (inner[2] - inner[0]) * (inner[3] - inner[1])
     
@@ -166,6 +208,35 @@ def expand_bbox(
     return [int(x_min), int(y_min), int(x_max), int(y_max)]
 
 
+def expand_bboxes(
+    bboxes,
+    expand_ratio: float = 0.1,
+    image_shape: Tuple[int, int] = None
+) -> np.ndarray:
+    """
+    Batched expand_bbox over many bboxes at once.
+
+    Args:
+        bboxes: (N, 4) array-like of [x_min, y_min, x_max, y_max]
+        expand_ratio: Ratio to expand (default 10%)
+        image_shape: Image (height, width) to clip bboxes
+
+    Returns:
+        (N, 4) int array of expanded bboxes
+    """
+    b = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    delta = (b[:, 2:] - b[:, :2]) * expand_ratio
+    out = np.concatenate([b[:, :2] - delta, b[:, 2:] + delta], axis=1)
+
+    if image_shape is not None:
+        img_h, img_w = image_shape
+        np.clip(out[:, 0::2], 0, img_w, out=out[:, 0::2])
+        np.clip(out[:, 1::2], 0, img_h, out=out[:, 1::2])
+
+    # int cast truncates toward zero, matching the scalar int()
+    return out.astype(np.int64)
+
+
 def crop_roi(image: np.ndarray, roi_bbox: List[int]) -> np.ndarray:
     """
     Crop region of interest from image.
@@ -173,20 +244,22 @@ def crop_roi(image: np.ndarray, roi_bbox: List[int]) -> np.ndarray:
     Args:
         image: Input image (H, W, C)
         roi_bbox: ROI bounding box [x_min, y_min, x_max, y_max]
-        
+
     Returns:
-        Cropped image region
+        Cropped image region — a zero-copy view into the input. cv2
+        handles the row stride fine; callers that need a contiguous
+        buffer (or want to mutate the crop) take their own copy.
     """
     x_min, y_min, x_max, y_max = roi_bbox
-    
+
     # Ensure valid bounds
     h, w = image.shape[:2]
     x_min = max(0, min(x_min, w - 1))
     y_min = max(0, min(y_min, h - 1))
     x_max = max(x_min + 1, min(x_max, w))
     y_max = max(y_min + 1, min(y_max, h))
-    
-    return image[y_min:y_max, x_min:x_max].copy()
+
+    return image[y_min:y_max, x_min:x_max]
 
 
 def get_bbox_center(bbox: List[float]) -> Tuple[float, float]:
@@ -285,3 +358,65 @@ def passes_person_filters(bbox: List[float]) -> tuple:
         return False, f"Bad aspect ratio {aspect_ratio:.2f} < {required:.2f} (machine/vehicle)"
 
     return True, None
+
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _person_filter_kernel(bw, bh, min_area, strict, lenient,
+                              dim_low, dim_high):
+        n = bw.shape[0]
+        out = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            if bw[i] <= 0 or bw[i] * bh[i] < min_area:
+                out[i] = False
+                continue
+            min_dim = min(bh[i], bw[i])
+            if min_dim <= dim_low:
+                required = strict
+            elif min_dim >= dim_high:
+                required = lenient
+            else:
+                t = (min_dim - dim_low) / (dim_high - dim_low)
+                required = strict + t * (lenient - strict)
+            out[i] = bh[i] / bw[i] >= required
+        return out
+else:
+    def _person_filter_kernel(bw, bh, min_area, strict, lenient,
+                              dim_low, dim_high):
+        valid = bw > 0
+        area_ok = valid & (bw * bh >= min_area)
+        min_dim = np.minimum(bh, bw)
+        t = np.clip((min_dim - dim_low) / (dim_high - dim_low), 0.0, 1.0)
+        required = strict + t * (lenient - strict)
+        aspect = np.where(valid, bh / np.where(valid, bw, 1.0), 0.0)
+        return area_ok & (aspect >= required)
+
+
+def passes_person_filters_bulk(bboxes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized passes_person_filters over a whole frame's persons.
+
+    Same min-area and dynamic aspect ratio rules as the scalar version,
+    evaluated in one compiled (or NumPy) pass instead of one Python
+    call per person. No reject reasons — callers that need them can
+    re-run the scalar filter on the rejected entries.
+
+    Args:
+        bboxes: (N, 4) array of [x_min, y_min, x_max, y_max]
+
+    Returns:
+        (N,) bool array — True where the bbox passes both filters
+    """
+    if bboxes.size == 0:
+        return np.zeros(0, dtype=bool)
+
+    bw = np.ascontiguousarray(bboxes[:, 2] - bboxes[:, 0], dtype=np.float32)
+    bh = np.ascontiguousarray(bboxes[:, 3] - bboxes[:, 1], dtype=np.float32)
+    return _person_filter_kernel(
+        bw, bh,
+        float(settings.min_person_area),
+        float(settings.aspect_ratio_strict),
+        float(settings.aspect_ratio_lenient),
+        float(settings.aspect_dim_low),
+        float(settings.aspect_dim_high),
+    )
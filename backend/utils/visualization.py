@@ -4,6 +4,8 @@ Visualization Utilities
 Functions for drawing bounding boxes and annotations on images.
 """
 
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
@@ -17,6 +19,25 @@ COLOR_VEST = (255, 255, 0)       # Cyan
 COLOR_PERSON = (255, 165, 0)     # Orange
 COLOR_NO_HELMET = (0, 0, 255)    # Red
 
+# Status label and color per 2-bit PPE key (has_helmet << 1 | has_vest)
+# — a tuple index replaces the per-person if/elif chain
+_STATUS_LUT = (
+    ("No Helmet, No Vest", COLOR_VIOLATION),  # 0b00
+    ("No Helmet", COLOR_VIOLATION),           # 0b01
+    ("No Vest", COLOR_VIOLATION),             # 0b10
+    ("SAFE", COLOR_SAFE),                     # 0b11
+)
+
+
+@lru_cache(maxsize=1024)
+def _text_size(label: str, font_scale: float, thickness: int):
+    """Memoized cv2.getTextSize — labels repeat heavily across frames
+    (same status / confidence bucket / decision path), so most draws
+    hit the cache instead of re-rasterizing glyph metrics."""
+    return cv2.getTextSize(
+        label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness
+    )
+
 
 def draw_single_bbox(
     image: np.ndarray,
@@ -24,11 +45,12 @@ def draw_single_bbox(
     label: str,
     color: Tuple[int, int, int],
     thickness: int = 2,
-    font_scale: float = 0.6
+    font_scale: float = 0.6,
+    inplace: bool = False
 ) -> np.ndarray:
     """
     Draw a single bounding box with label on image.
-    
+
     Args:
         image: Input image (BGR)
         bbox: Bounding box [x_min, y_min, x_max, y_max]
@@ -36,20 +58,27 @@ def draw_single_bbox(
         color: BGR color tuple
         thickness: Line thickness
         font_scale: Font size scale
-        
+        inplace: Draw directly on `image` instead of a copy — callers
+                 drawing many boxes copy once themselves and pass True
+
     Returns:
         Annotated image
     """
-    img = image.copy()
-    x_min, y_min, x_max, y_max = [int(v) for v in bbox]
+    img = image if inplace else image.copy()
+    if isinstance(bbox, np.ndarray):
+        # One C-level conversion for the whole row (already ints when
+        # the caller pre-cast, as draw_detections does)
+        x_min, y_min, x_max, y_max = bbox.astype(np.int32, copy=False).tolist()
+    else:
+        x_min, y_min, x_max, y_max = [int(v) for v in bbox]
     
     # Draw rectangle
     cv2.rectangle(img, (x_min, y_min), (x_max, y_max), color, thickness)
     
     # Draw label background
     font = cv2.FONT_HERSHEY_SIMPLEX
-    (text_width, text_height), baseline = cv2.getTextSize(
-        label, font, font_scale, thickness
+    (text_width, text_height), baseline = _text_size(
+        label, font_scale, thickness
     )
     
     # Position label above bbox
@@ -81,48 +110,58 @@ def draw_detections(
     image: np.ndarray,
     detection_result: Dict,
     show_confidence: bool = True,
-    show_decision_path: bool = True
+    show_decision_path: bool = True,
+    inplace: bool = False,
+    use_umat: bool = False
 ) -> np.ndarray:
     """
     Draw all detections from hybrid detector result.
-    
+
     Color coding:
     - Green (#10b981): Safe (helmet + vest)
     - Red (#ef4444): Violation (missing PPE)
-    
+
     Args:
         image: Input image (BGR)
         detection_result: Result from HybridDetector.detect()
         show_confidence: Show detection confidence
         show_decision_path: Show which decision path was used
-        
+        inplace: Draw directly on `image` instead of a copy — skips a
+                 full-frame memcpy when the caller discards the frame
+        use_umat: Route drawing through cv2.UMat so OpenCV's T-API can
+                  run it via OpenCL — worth it for 4K frames where the
+                  draws are memory-bound on the host. Always returns a
+                  fresh array (the device round trip is itself a copy),
+                  so `inplace` has no effect with this set
+
     Returns:
         Annotated image with all detections
     """
-    img = image.copy()
-    
     # Get persons from detection result
     persons = detection_result.get("persons", [])
-    
-    for person in persons:
-        bbox = person["bbox"]
+
+    if use_umat and persons:
+        # The UMat upload replaces the host-side working copy
+        img = cv2.UMat(image)
+    else:
+        img = image if inplace else image.copy()
+
+    if not persons:
+        return img
+
+    # Cast every bbox to int in one vectorized pass instead of four
+    # int() calls per person inside draw_single_bbox
+    bboxes = np.asarray([p["bbox"] for p in persons], dtype=np.int32)
+
+    for i, person in enumerate(persons):
+        bbox = bboxes[i]
         has_helmet = person.get("has_helmet", False)
         has_vest = person.get("has_vest", False)
         confidence = person.get("confidence", 0)
         decision_path = person.get("decision_path", "Unknown")
         
-        # Determine status and color
-        if has_helmet and has_vest:
-            status = "SAFE"
-            color = COLOR_SAFE
-        else:
-            missing = []
-            if not has_helmet:
-                missing.append("No Helmet")
-            if not has_vest:
-                missing.append("No Vest")
-            status = ", ".join(missing)
-            color = COLOR_VIOLATION
+        # Status and color in one LUT index instead of an if/elif chain
+        status, color = _STATUS_LUT[(int(has_helmet) << 1) | int(has_vest)]
         
         # Build label
         label_parts = [status]
@@ -133,10 +172,12 @@ def draw_detections(
         
         label = " | ".join(label_parts)
         
-        # Draw bbox with label
-        img = draw_single_bbox(img, bbox, label, color)
-    
-    return img
+        # Draw bbox with label directly on the one working copy —
+        # per-box copies were a full-frame memcpy per person
+        draw_single_bbox(img, bbox, label, color, inplace=True)
+
+    # Download the annotated frame if it was drawn on the device
+    return img.get() if use_umat else img
 
 
 def draw_roi_overlay(
@@ -162,28 +203,52 @@ def draw_roi_overlay(
         Image with ROI overlay
     """
     img = image.copy()
-    overlay = image.copy()
-    
-    # Draw person bbox
-    x_min, y_min, x_max, y_max = [int(v) for v in person_bbox]
-    cv2.rectangle(overlay, (x_min, y_min), (x_max, y_max), COLOR_PERSON, 2)
-    
+    h, w = img.shape[:2]
+
+    def _clip(bbox):
+        x0, y0, x1, y1 = [int(v) for v in bbox]
+        return max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+
+    def _blend_fill(bbox, color):
+        # Blend a filled rectangle against just its own pixels —
+        # blending the whole frame for a few small rects was pure
+        # bandwidth waste, the cost now tracks ROI area not image area
+        x0, y0, x1, y1 = _clip(bbox)
+        if x1 <= x0 or y1 <= y0:
+            return
+        roi = img[y0:y1, x0:x1]
+        plane = np.full_like(roi, color)
+        cv2.addWeighted(plane, alpha, roi, 1 - alpha, 0, dst=roi)
+
+    # Draw person bbox (outline blended within its own sub-rect)
+    x0, y0, x1, y1 = _clip(person_bbox)
+    if x1 > x0 and y1 > y0:
+        sub = img[y0:y1, x0:x1]
+        outlined = sub.copy()
+        cv2.rectangle(
+            outlined, (0, 0), (x1 - x0 - 1, y1 - y0 - 1), COLOR_PERSON, 2
+        )
+        cv2.addWeighted(outlined, alpha, sub, 1 - alpha, 0, dst=sub)
+
     # Draw head ROI
     if head_roi is not None:
-        hx_min, hy_min, hx_max, hy_max = [int(v) for v in head_roi]
-        cv2.rectangle(overlay, (hx_min, hy_min), (hx_max, hy_max), (0, 255, 255), -1)
-    
+        _blend_fill(head_roi, (0, 255, 255))
+
     # Draw torso ROI
     if torso_roi is not None:
-        tx_min, ty_min, tx_max, ty_max = [int(v) for v in torso_roi]
-        cv2.rectangle(overlay, (tx_min, ty_min), (tx_max, ty_max), (255, 0, 255), -1)
-    
-    # Blend overlay
-    img = cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0)
-    
+        _blend_fill(torso_roi, (255, 0, 255))
+
     return img
 
 
+@lru_cache(maxsize=4)
+def _panel_background(width: int, height: int) -> np.ndarray:
+    """Cached dark-gray stats-panel background — frame width is stable
+    across a stream, so the broadcast fill happens once per size and
+    every later frame pays a straight memcpy instead."""
+    return np.full((height, width, 3), 30, dtype=np.uint8)
+
+
 def create_summary_image(
     image: np.ndarray,
     detection_result: Dict,
@@ -205,13 +270,15 @@ def create_summary_image(
     # Calculate info panel height
     panel_height = 120
     
-    # Create new image with panel
+    # Create new image with panel — np.empty, since every byte is
+    # written below anyway (zero-filling the image region would be an
+    # extra full pass over h*w*3 bytes just to overwrite it)
     new_h = h + panel_height
-    result = np.zeros((new_h, w, 3), dtype=np.uint8)
-    result[:h, :, :] = image
-    
-    # Draw info panel background
-    result[h:, :, :] = (30, 30, 30)  # Dark gray
+    result = np.empty((new_h, w, 3), dtype=np.uint8)
+    np.copyto(result[:h], image)
+
+    # Draw info panel background (dark gray, cached per frame width)
+    np.copyto(result[h:], _panel_background(w, panel_height))
     
     # Get stats
     total_persons = len(detection_result.get("persons", []))